@@ -3,15 +3,44 @@ import sys
 
 from aiogram import Bot, Dispatcher
 from aiogram.exceptions import TelegramUnauthorizedError, TelegramNetworkError
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.utils.token import TokenValidationError
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+
+def _create_fsm_storage() -> BaseStorage:
+    """
+    Создаёт хранилище состояний FSM.
+
+    Если задан REDIS_URL — состояния хранятся в Redis и переживают перезапуск бота.
+    Иначе используется MemoryStorage (состояния живут только в текущем процессе).
+
+    Redis не делает возможным запуск нескольких экземпляров: бот работает через long polling,
+    а кэши пользователей, справочника, расписаний, готовых текстов, индекса преподавателей
+    и списка администраторов живут в памяти процесса и сбрасываются только в том процессе,
+    где произошло изменение. Бот должен работать в одном экземпляре.
+    """
+
+    if not settings.REDIS_URL:
+        return MemoryStorage()
+
+    try:
+        from aiogram.fsm.storage.redis import RedisStorage
+    except ImportError:
+        logger.critical("❌ Задан REDIS_URL, но пакет redis не установлен (pip install 'schedule-bot[redis]').")
+        sys.exit(1)
+
+    logger.info("✅ Состояния FSM хранятся в Redis")
+    return RedisStorage.from_url(settings.REDIS_URL)
+
+
 try:
     bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
-    dp = Dispatcher(bot=bot)
+    dp = Dispatcher(bot=bot, storage=_create_fsm_storage())
 
 except (ValueError, TokenValidationError):
     logger.critical("❌ Ошибка при инициализации бота: неверный формат токена.")
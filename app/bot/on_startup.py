@@ -10,11 +10,12 @@ from app.keyboards.sync_kb import refresh_sync_keyboards
 from app.utils.admins.admin_list import refresh_admin_list, check_admins_start
 from app.utils.custom_logging.TelegramLogHandler import send_chat_info_log
 from app.utils.custom_logging.setup_log import setup_logging
-from app.database.db import checking_db
+from app.database.db import check_db_pool, checking_db
 from app.handlers.init_handlers import register_handlers
 from app.utils.schedule.auto_sync import schedule_sync_task
 from app.utils.week_mark.week_mark import init_week_mark, update_week_mark
 from app.middlewares.UserContextMiddleware import UserContextMiddleware
+from app.utils.messages.tg_send_queue import start_send_worker
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,12 @@ async def on_startup():
     except Exception as e:
         logger.warning(f"⚠️ Не удалось удалить webhook: {e}")
 
+    try:
+        check_db_pool()
+    except RuntimeError as e:
+        logger.critical(f"❌ Неверная конфигурация пула соединений БД: {e}")
+        sys.exit(1)
+
     try:
         await checking_db()
     except Exception as e:
@@ -64,6 +71,7 @@ async def on_startup():
 
     await init_week_mark()
 
+    start_send_worker()
     asyncio.create_task(update_week_mark())
     asyncio.create_task(schedule_sync_task())
 
@@ -27,6 +27,7 @@ class Settings(BaseSettings):
         TIMETABLE_API_BASE: URL для подключения к сайту университета
         DB_TIMETABLE_URL: URL для подключения к базе данных
         LIST_ADMINS_URL: URL для списка администраторов
+        REDIS_URL: URL Redis для хранения состояний FSM (если не задан — состояния хранятся в памяти)
 
         REQUEST_CONCURRENCY: Ограничения числа одновременно выполняющихся запросов
         REQUEST_DELAY: Пауза между запросами
@@ -50,6 +51,7 @@ class Settings(BaseSettings):
 
     TIMETABLE_API_BASE: str = Field(default=..., validation_alias='TIMETABLE_API_BASE')
     DB_TIMETABLE_URL: str = Field(default="")
+    REDIS_URL: str = Field(default="", validation_alias='REDIS_URL')
 
     REQUEST_CONCURRENCY: int = Field(default=..., validation_alias='REQUEST_CONCURRENCY')
     REQUEST_DELAY: float = Field(default=..., validation_alias='REQUEST_DELAY')
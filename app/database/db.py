@@ -2,33 +2,82 @@
 Асинхронная настройка работы с базой данных SQLite через SQLAlchemy.
 
 Содержит:
-1. Асинхронный движок подключения к SQLite.
+1. Асинхронный движок подключения к SQLite (или к серверной БД, если задан её URL).
 2. Фабрику асинхронных сессий.
 3. Проверку и инициализацию базы данных.
+4. Конструктор INSERT текущего диалекта (dialect_insert) с поддержкой ON CONFLICT.
 """
-from sqlalchemy import StaticPool
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import logging
+
+from sqlalchemy import AsyncAdaptedQueuePool, StaticPool, make_url
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.config import settings
 
 from app.database.init_db import init_db
 
+logger = logging.getLogger(__name__)
+
+IS_SQLITE = make_url(settings.DB_TIMETABLE_URL).get_backend_name() == "sqlite"
+
+# INSERT ... ON CONFLICT DO UPDATE (upsert) поддерживают и SQLite, и PostgreSQL,
+# но конструкция доступна только в insert() конкретного диалекта
+dialect_insert = sqlite_insert if IS_SQLITE else postgresql_insert
+
+if IS_SQLITE:
+    engine_options = {
+        "poolclass": StaticPool,        # одно и то же соединение для всех операций
+        "connect_args": {
+            "check_same_thread": False,  # для многопоточности SQLite
+            "timeout": 15                # таймаут
+        }
+    }
+else:
+    # Серверная БД (например, PostgreSQL через asyncpg): пул соединений под пиковую нагрузку.
+    # Пул указан явно: синхронный QueuePool в async-движке приводит к зависанию
+    # всех хендлеров на `async with AsyncSessionLocal()` под нагрузкой.
+    engine_options = {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": 20,
+        "max_overflow": 40,
+        "pool_pre_ping": True,          # проверка соединения перед выдачей из пула
+        "pool_recycle": 1800,           # пересоздавать соединения старше 30 минут
+    }
+
+EXPECTED_POOL_CLASS = engine_options["poolclass"]
+
 engine = create_async_engine(
-    settings.DB_TIMETABLE_URL,          # URL подключения к SQLite
+    settings.DB_TIMETABLE_URL,          # URL подключения к БД
     echo=False,                         # echo=True = логировать SQL-запросы в консоль
     future=True,                        # новый API SQLAlchemy 2.0
-    poolclass=StaticPool,               # одно и то же соединение для всех операций
-    connect_args={
-        "check_same_thread": False,  # для многопоточности SQLite
-        "timeout": 15                # таймаут
-    }
+    **engine_options
 )
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
+    class_=AsyncSession,
     expire_on_commit=False,
     autoflush=False
 )
 
+def check_db_pool():
+    """
+    Проверка класса пула соединений движка.
+
+    Вызывается при запуске отдельно от checking_db: с неподходящим пулом бот
+    зависает под нагрузкой, поэтому ошибка не перехватывается и останавливает запуск.
+
+    Исключения:
+        RuntimeError: Если движок использует не EXPECTED_POOL_CLASS.
+    """
+    if not isinstance(engine.pool, EXPECTED_POOL_CLASS):
+        raise RuntimeError(
+            f"Движок БД использует {type(engine.pool).__name__} вместо {EXPECTED_POOL_CLASS.__name__}"
+        )
+    logger.info(f"✅ Пул соединений БД: {type(engine.pool).__name__}")
+
+
 async def checking_db():
     """Проверка существования бд и инициализация при отсутствии"""
-    await init_db(engine)
\ No newline at end of file
+    await init_db(engine)
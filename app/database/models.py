@@ -38,7 +38,7 @@ class User(Base):
     id = Column(Integer, primary_key=True)  # Telegram user_id
     group_id = Column(Integer, ForeignKey("groups.id", ondelete="SET NULL"), nullable=True, index=True)
     faculty_id = Column(Integer, ForeignKey("faculties.id", ondelete="SET NULL"), nullable=True, index=True)
-    role = Column(Integer, nullable=False, default=0)
+    role = Column(Integer, nullable=False, default=0, server_default="0")
 
     group = relationship("Group", lazy="joined")
     faculty = relationship("Faculty", lazy="joined")
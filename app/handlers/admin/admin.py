@@ -12,34 +12,22 @@ from app.filters.is_admin import IsAdminFilter
 from app.keyboards.admin_kb import get_admin_kb
 from app.state.states import AddAdminStates
 from app.database.db import AsyncSessionLocal
-from app.utils.admins.admin_list import add_admin_to_list, remove_admin_from_list, get_admin_username
+from app.utils.admins.admin_list import add_admin_to_list, remove_admin_from_list
+from app.utils.cache.user_cache import invalidate_user
 from app.utils.custom_logging.BufferedLogHandler import global_buffer_handler
-from app.utils.messages.safe_delete_messages import safe_delete_message, safe_delete_callback_message
+from app.utils.messages.safe_delete_messages import safe_delete_message, safe_delete_callback_message, safe_delete_many
+from app.utils.messages.tg_send_queue import enqueue
+from app.utils.schedule.schedule_formatter import escape_md_v2
 import app.utils.admins.admin_list as admin_list
 
 router = Router()
 logger = logging.getLogger(__name__)
 
-
-def escape_md_v2(text: str) -> str:
-    """
-    Экранирует специальные символы для Telegram MarkdownV2.
-
-    Telegram MarkdownV2 требует экранирования некоторых символов, чтобы они
-    не интерпретировались как разметка. Эта функция добавляет обратный слэш
-    перед каждым спецсимволом из списка, чтобы текст отображался корректно.
-
-    Параметры:
-        text (str): Исходный текст.
-
-    Возвращает:
-        str: Экранированный текст, безопасный для использования с MarkdownV2.
-    """
-
-    escape_chars = r"_*[]()~`>#+-=|{}.!\\"
-    for ch in escape_chars:
-        text = text.replace(ch, f"\\{ch}")
-    return text
+# Клавиатура возврата в админ-панель — создаётся один раз при загрузке модуля
+_BACK_TO_ADMIN_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="◀️ Назад", callback_data="admin_panel")]
+    ])
 
 
 @router.callback_query(F.data=="exit_admin_panel", IsAdminFilter())
@@ -117,13 +105,9 @@ async def add_admin(callback: CallbackQuery, state: FSMContext):
 
     await state.clear()
 
-    kb = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="◀️ Назад", callback_data="admin_panel")]
-        ])
     await callback.message.edit_text(text="Введите ID пользователя для назначения администратором.\n"
                                      "Для того чтобы узнать id можно воспользоваться @username_to_id_bot",
-                                     reply_markup=kb)
+                                     reply_markup=_BACK_TO_ADMIN_KB)
     await state.set_state(AddAdminStates.waiting_id)
     await callback.answer()
     await state.update_data(message_id=callback.message.message_id)
@@ -152,21 +136,9 @@ async def reading_id(message: Message, state: FSMContext):
         Exception: Любые другие ошибки работы с БД или Telegram API.
     """
 
-    cancel_kb = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="◀️ Назад", callback_data="admin_panel")]
-        ])
-
-    await safe_delete_message(message)
-
     try:
         data = await state.get_data()
-        message_id_to_delete = data.get("message_id")
-        if message_id_to_delete:
-            try:
-                await message.bot.delete_message(chat_id=message.chat.id, message_id=message_id_to_delete)
-            except Exception as e:
-                logger.debug(f"⚠️ Не удалось удалить сообщение отправленное add_admin: {e}")
+        await safe_delete_many(message, (message.chat.id, data.get("message_id")))
 
         try:
             user_id = int(message.text)
@@ -180,7 +152,7 @@ async def reading_id(message: Message, state: FSMContext):
             new_instruction_msg = await message.answer(
                 text="Повторно введите ID пользователя для назначения администратором.\n"
                      "Для того чтобы узнать id можно воспользоваться @username_to_id_bot",
-                reply_markup=cancel_kb
+                reply_markup=_BACK_TO_ADMIN_KB
             )
 
             await state.update_data(message_id=new_instruction_msg.message_id)
@@ -195,47 +167,53 @@ async def reading_id(message: Message, state: FSMContext):
             await state.clear()
             return
 
+        # Транзакция охватывает только работу с БД — соединение не удерживается на время запросов к Telegram
         async with AsyncSessionLocal() as session:
-            user = await session.get(User, user_id)
-            if not user:
-                error_msg = await message.answer(f"❌ Пользователь с ID {user_id} не найден.")
-                logger.info(f"⚠️ Попытка назначить администратором несуществующего пользователя {user_id}.")
+            row = (await session.execute(
+                select(User.id, User.role).where(User.id == user_id)
+            )).first()
+
+            if row is not None and row.role != 1:
+                await session.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(role=1)
+                )
+                await session.commit()
+                invalidate_user(user_id)
 
-                await asyncio.sleep(1)
+        if row is None:
+            error_msg = await message.answer(f"❌ Пользователь с ID {user_id} не найден.")
+            logger.info(f"⚠️ Попытка назначить администратором несуществующего пользователя {user_id}.")
 
-                new_instruction_msg = await message.answer(
-                    text="Повторно введите ID пользователя для назначения администратором.\n"
-                         "Для того чтобы узнать id можно воспользоваться @username_to_id_bot",
-                    reply_markup=cancel_kb
-                )
+            await asyncio.sleep(1)
 
-                await state.update_data(message_id=new_instruction_msg.message_id)
+            new_instruction_msg = await message.answer(
+                text="Повторно введите ID пользователя для назначения администратором.\n"
+                     "Для того чтобы узнать id можно воспользоваться @username_to_id_bot",
+                reply_markup=_BACK_TO_ADMIN_KB
+            )
 
-                await asyncio.sleep(1)
-                await safe_delete_message(error_msg)
+            await state.update_data(message_id=new_instruction_msg.message_id)
 
-                return
+            await asyncio.sleep(1)
+            await safe_delete_message(error_msg)
 
-            if user.role == 1:
-                await message.answer(f"ℹ️ Пользователь {user_id} уже является администратором.")
-                logger.info(f"ℹ️ Попытка назначить администратором пользователя {user_id}, который уже им является.")
-                await state.clear()
-                return
+            return
 
-            await session.execute(
-                update(User)
-                .where(User.id == user_id)
-                .values(role=1)
-            )
-            await session.commit()
+        if row.role == 1:
+            await message.answer(f"ℹ️ Пользователь {user_id} уже является администратором.")
+            logger.info(f"ℹ️ Попытка назначить администратором пользователя {user_id}, который уже им является.")
+            await state.clear()
+            return
 
-            success_message = f"✅ Пользователь {user_id} назначен администратором."
-            await message.answer(success_message)
-            logger.info(success_message)
+        success_message = f"✅ Пользователь {user_id} назначен администратором."
+        await message.answer(success_message)
+        logger.info(success_message)
 
-            await add_admin_to_list(user_id)
+        await add_admin_to_list(user_id)
 
-            await state.clear()
+        await state.clear()
 
     except Exception as e:
         await message.answer("❌ Ошибка при назначении администратора.")
@@ -274,32 +252,32 @@ async def list_admins(callback: CallbackQuery):
         await callback.answer()
         return
 
-    text = "📋 *Список администраторов:*\n\n"
+    text_parts = ["📋 *Список администраторов:*\n\n"]
+    builder = InlineKeyboardBuilder()
 
+    # Один проход по словарю: строка списка и кнопка удаления формируются одновременно
     for i, (admin_id, username) in enumerate(admins.items(), 1):
         escaped_id = escape_md_v2(str(admin_id))
-
-        username = get_admin_username(admin_id)
         username_text = f" — {escape_md_v2(username)}" if username is not None else ""
 
-        current_user_marker = " ⭐ Это вы" if admin_id == callback.from_user.id else ""
+        if admin_id == callback.from_user.id:
+            current_user_marker = " ⭐ Это вы"
+        else:
+            current_user_marker = ""
+            builder.button(
+                text=f"🗑️ Удалить {admin_id}",
+                callback_data=f"remove_admin_{admin_id}"
+            )
 
-        text += (f"{i}\\. ID `{escaped_id}`{username_text}"
-                 f"\n     {current_user_marker}\n")
+        text_parts.append(f"{i}\\. ID `{escaped_id}`{username_text}"
+                          f"\n     {current_user_marker}\n")
 
-    text += (
+    text_parts.append(
         "\nПри не рабочей или отсутствующей ссылке воспользуйтесь:\n"
         "app\\: tg\\:\\/\\/user\\?id\\=ID\n"
         "web\\: https\\:\\/\\/web\\.telegram\\.org\\/k\\/\\#ID\n"
     )
-
-    builder = InlineKeyboardBuilder()
-    for admin_id, username in admins.items():
-        if admin_id != callback.from_user.id:
-            builder.button(
-                text=f"🗑️ Удалить {admin_id}",
-                callback_data=f"remove_admin_{admin_id}"
-            )
+    text = "".join(text_parts)
 
     builder.button(text="◀️ Назад", callback_data="admin_panel")
     builder.adjust(1)
@@ -329,21 +307,22 @@ async def remove_admin_handler(callback: CallbackQuery):
         callback (CallbackQuery): Объект callback-запроса.
 
     Исключения:
-        ValueError: Если ID некорректный.
-        IndexError: Если формат callback.data некорректен.
+        ValueError: Если ID в callback.data некорректный.
         Exception: Любые другие ошибки в процессе удаления.
     """
 
     try:
-        admin_id = int(callback.data.split("_")[2])
+        admin_id = int(callback.data[len("remove_admin_"):])
 
         if admin_id == callback.from_user.id:
             await callback.answer(text="❌ Вы не можете снять права с самого себя", show_alert=True)
             return
 
         async with AsyncSessionLocal() as session:
-            user = await session.get(User, admin_id)
-            if not user:
+            row = (await session.execute(
+                select(User.id, User.role).where(User.id == admin_id)
+            )).first()
+            if row is None:
                 await callback.answer(text="❌ Пользователь не найден", show_alert=True)
                 return
 
@@ -354,6 +333,8 @@ async def remove_admin_handler(callback: CallbackQuery):
             )
             await session.commit()
 
+        invalidate_user(admin_id)
+
         txt = f"✅ ID: {admin_id} снят с должности администратора."
         logger.info(txt)
         await callback.message.edit_text(text=txt)
@@ -361,10 +342,9 @@ async def remove_admin_handler(callback: CallbackQuery):
 
         await remove_admin_from_list(admin_id)
 
-        await asyncio.sleep(1)
-        await callback.message.edit_text(text="Админ панель", reply_markup=get_admin_kb())
+        enqueue(lambda: callback.message.edit_text(text="Админ панель", reply_markup=get_admin_kb()), delay=1)
 
-    except (ValueError, IndexError) as e:
+    except ValueError as e:
         await callback.answer(text="❌ Ошибка при обработке запроса", show_alert=True)
         logger.error(f"❌ Ошибка в при снятии роли администратора: {e}")
     except Exception as e:
@@ -380,8 +360,7 @@ async def send_buffered_logs(callback: CallbackQuery):
 
     await safe_delete_callback_message(callback)
 
-    file_bytes = global_buffer_handler.get_logs_as_file()
-    input_file = BufferedInputFile(file_bytes.getvalue(), filename="buffered_logs.txt")
+    input_file = BufferedInputFile(global_buffer_handler.get_logs_as_bytes(), filename="buffered_logs.txt")
 
     await callback.message.answer_document(
         document=input_file,
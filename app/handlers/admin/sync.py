@@ -30,6 +30,7 @@ from app.utils.schedule.worker import (
     run_full_sync_for_faculty
 )
 from app.keyboards.base_kb import abbr_faculty
+from app.keyboards.callback_factories import FacultyCallback, GroupCallback
 from app.keyboards.sync_kb import get_type_sync_kb
 import app.keyboards.sync_kb as sync_kb
 from app.utils.schedule.sync_lock import (
@@ -43,7 +44,17 @@ from app.state.states import SyncStates
 router = Router()
 logger = logging.getLogger(__name__)
 
-@router.callback_query(F.data.startswith("cancel_"), F.data.endswith("_sync"), IsAdminFilter())
+# Клавиатура отмены синхронизации университета — создаётся один раз при загрузке модуля
+_CANCEL_UNIVERSITY_SYNC_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_university_sync")]
+    ]
+)
+
+@router.callback_query(
+    F.data.in_({"cancel_faculty_sync", "cancel_group_sync", "cancel_choice_sync", "cancel_university_sync"}),
+    IsAdminFilter()
+)
 async def cancel_sync(callback: CallbackQuery, state: FSMContext):
     """
     Обработка отмены синхронизации.
@@ -97,15 +108,9 @@ async def sync_all_handler(callback: CallbackQuery, state: FSMContext):
     await state.set_state(SyncStates.confirm_full_sync)
     await state.update_data(confirm_message_id=callback.message.message_id)
 
-    kb_cancel = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="❌ Отмена", callback_data=f"cancel_university_sync")]
-        ]
-    )
-
     await callback.message.edit_text(
         text="Отправьте 'Да' для подтверждение синхронизации.",
-        reply_markup=kb_cancel
+        reply_markup=_CANCEL_UNIVERSITY_SYNC_KB
     )
     await callback.answer()
 
@@ -186,8 +191,8 @@ async def sync_faculty_handler(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
 
 
-@router.callback_query(StateFilter(SyncStates.sync_faculty), F.data.startswith("faculty:"), IsAdminFilter())
-async def sync_faculty_selected(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(StateFilter(SyncStates.sync_faculty), FacultyCallback.filter(), IsAdminFilter())
+async def sync_faculty_selected(callback: CallbackQuery, callback_data: FacultyCallback, state: FSMContext):
     """
     Обрабатывает выбор факультета.
 
@@ -201,7 +206,7 @@ async def sync_faculty_selected(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
-    faculty_name = abbr_faculty[callback.data.split(":")[1]]
+    faculty_name = abbr_faculty[callback_data.abbr]
     logger.info(f"⏳ Начата синхронизация для факультета {faculty_name}...")
     try:
         await set_sync_running()
@@ -245,8 +250,8 @@ async def sync_group_start(callback: CallbackQuery, state: FSMContext):
         await callback.message.answer("❌ Ошибка при синхронизации расписания для группы.")
         await callback.answer()
 
-@router.callback_query(StateFilter(SyncStates.sync_group_faculty), F.data.startswith("faculty:"), IsAdminFilter())
-async def sync_group_select_faculty(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(StateFilter(SyncStates.sync_group_faculty), FacultyCallback.filter(), IsAdminFilter())
+async def sync_group_select_faculty(callback: CallbackQuery, callback_data: FacultyCallback, state: FSMContext):
     """
     После выбора факультета — показывает группы этого факультета.
 
@@ -260,7 +265,7 @@ async def sync_group_select_faculty(callback: CallbackQuery, state: FSMContext):
         return
 
     try:
-        faculty_name = abbr_faculty[callback.data.split(":")[1]]
+        faculty_name = abbr_faculty[callback_data.abbr]
         groups_kb = sync_kb.groups_keyboards_sync.get(faculty_name)
 
         if not groups_kb:
@@ -280,8 +285,8 @@ async def sync_group_select_faculty(callback: CallbackQuery, state: FSMContext):
         await state.clear()
 
 
-@router.callback_query(StateFilter(SyncStates.sync_group_select), F.data.startswith("group:"), IsAdminFilter())
-async def sync_group_selected(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(StateFilter(SyncStates.sync_group_select), GroupCallback.filter(), IsAdminFilter())
+async def sync_group_selected(callback: CallbackQuery, callback_data: GroupCallback, state: FSMContext):
     """
     Выполняет синхронизацию для выбранной группы.
 
@@ -299,7 +304,7 @@ async def sync_group_selected(callback: CallbackQuery, state: FSMContext):
     try:
         await set_sync_running()
 
-        group_name = callback.data.split(":")[1]
+        group_name = callback_data.name
         logger.info(f"⏳Начата синхронизация для группы {group_name}...")
 
         await callback.message.edit_text(f"⏳ Синхронизация расписания для группы {group_name}...")
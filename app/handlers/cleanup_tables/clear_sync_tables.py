@@ -1,4 +1,4 @@
-import asyncio
+import hmac
 import logging
 
 from aiogram import Router, F
@@ -11,12 +11,28 @@ from app.database.models import Faculty, Group, Lesson, Professor, ProfessorLess
 from app.config import settings
 from app.filters.is_admin import IsAdminFilter
 from app.keyboards.admin_kb import get_admin_kb
+from app.utils.cache.refdata import clear_refdata
+from app.utils.cache.schedule_cache import clear_schedule_cache
+from app.utils.cache.user_cache import clear_users_cache
+from app.utils.schedule.search_professors import clear_professor_index
+from app.utils.messages.safe_delete_messages import safe_delete_message, safe_delete_many
 from app.state.states import DeleteSyncTablesStates
+from app.utils.messages.send_messages import finalize_callback
+from app.utils.messages.tg_send_queue import enqueue
 
 
 logger = logging.getLogger(__name__)
 router = Router()
 
+# Клавиатура отмены очистки — создаётся один раз при загрузке модуля
+_CANCEL_CLEAR_SYNC_TABLES_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_clear_sync_tables")]
+    ])
+
+# Таблицы синхронизации в порядке удаления: сначала зависимые, затем справочники
+_SYNC_TABLES = (ProfessorLesson, Lesson, Professor, Group, Faculty)
+
 
 @router.callback_query(F.data=="cancel_clear_sync_tables", IsAdminFilter())
 async def cancel_clear_sync_tables(callback: CallbackQuery, state: FSMContext):
@@ -26,14 +42,12 @@ async def cancel_clear_sync_tables(callback: CallbackQuery, state: FSMContext):
     Логика:
         - Состояние FSM очищается.
         - Сообщение с предупреждением заменяется текстом об отмене.
-        - Сообщение возвращается в интерфейс админ панели.
+        - Через секунду сообщение возвращается в интерфейс админ панели (через очередь отправки, хендлер не ждёт).
     """
 
     await state.clear()
-    await callback.message.edit_text("❌ Очистка таблиц синхронизации отменена")
-    await callback.answer()
-    await asyncio.sleep(1)
-    await callback.message.edit_text(text="Админ панель:", reply_markup=get_admin_kb())
+    await finalize_callback(callback, callback.message.edit_text("❌ Очистка таблиц синхронизации отменена"))
+    enqueue(lambda: callback.message.edit_text(text="Админ панель:", reply_markup=get_admin_kb()), delay=1)
 
 
 @router.callback_query(F.data=="clear_sync_tables", IsAdminFilter())
@@ -47,12 +61,7 @@ async def clear_sync_tables(callback: CallbackQuery, state: FSMContext):
     await callback.message.edit_text(
         text="⚠️ Эта операция удалит данные из таблиц: факультетов, групп, пар студентов, преподавателей, пар преподавателей.\n"
              "Введите пароль для подтверждения:",
-        reply_markup=InlineKeyboardMarkup(
-            inline_keyboard=[
-            [
-                InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_clear_sync_tables")
-            ]
-        ])
+        reply_markup=_CANCEL_CLEAR_SYNC_TABLES_KB
     )
 
     await callback.answer()
@@ -69,8 +78,8 @@ async def confirm_clear_sync_tables(message: Message, state: FSMContext):
         1. Удаляет сообщение с запросом пароля (если есть).
         2. Проверяет пароль (ADMIN_PASSWORD).
         3. При успешной проверке подключается к БД.
-        4. Выполняет поочередное удаление всех записей из таблиц: ProfessorLesson, Lesson, Professor, Group, Faculty.
-        5. Фиксирует транзакцию.
+        4. В одной транзакции удаляет все записи из таблиц _SYNC_TABLES: ProfessorLesson, Lesson, Professor, Group, Faculty.
+        5. Фиксирует транзакцию и логирует количество удалённых записей по каждой таблице.
         6. Отправляет сообщение об успешной очистке.
         7. Очищает состояние FSM.
 
@@ -83,45 +92,40 @@ async def confirm_clear_sync_tables(message: Message, state: FSMContext):
     data = await state.get_data()
     confirm_message_id = data.get("confirm_message_id")
 
-    if confirm_message_id:
-        try:
-            await message.bot.delete_message(chat_id=message.chat.id, message_id=confirm_message_id)
-        except Exception as e:
-            logger.debug(f"Не удалось удалить сообщение с подтверждением очистки таблиц: {e}")
+    await safe_delete_many((message.chat.id, confirm_message_id), message)
 
-    try:
-        await message.delete()
-    except Exception as e:
-        logger.debug(f"⚠️ Не удалось удалить сообщение пользователя с паролем: {e}")
-
-    if message.text != settings.ADMIN_PASSWORD:
+    # Сравнение за постоянное время; байты — т.к. для str compare_digest принимает только ASCII
+    if not hmac.compare_digest((message.text or "").encode(), settings.ADMIN_PASSWORD.encode()):
         logger.warning("❌ Попытка очистки таблиц синхронизаций с неверным паролем.")
         try:
             msg = await message.answer("❌ Неверный пароль")
-            await asyncio.sleep(1)
-            try:
-                await msg.delete()
-            except Exception as e:
-                logger.debug(f"⚠️ Не удалось удалить сообщение 'Неверный пароль': {e}")
+            enqueue(lambda: safe_delete_message(msg), delay=1)
         except Exception as e:
             logger.error(f"❌ Ошибка при отправке сообщения 'Неверный пароль': {e}")
         await state.clear()
         return
 
+    deleted_counts = {}
+    cleared = False
     async with AsyncSessionLocal() as session:
         try:
             async with session.begin():
-                await session.execute(delete(ProfessorLesson))
-                await session.execute(delete(Lesson))
-                await session.execute(delete(Professor))
-                await session.execute(delete(Group))
-                await session.execute(delete(Faculty))
-
-            txt = "✅ Таблицы Faculty, Group, Lesson, Professor, ProfessorLesson успешно очищены."
-            await message.answer(txt)
-            logger.info(txt)
+                for model in _SYNC_TABLES:
+                    result = await session.execute(delete(model))
+                    deleted_counts[model.__tablename__] = result.rowcount or 0
+            cleared = True
 
         except Exception as e:
             logger.error(f"❌ Ошибка при очистке таблиц синхронизации: {e}")
 
-    await state.clear()
\ No newline at end of file
+    # Уведомление отправляется уже после закрытия сессии
+    if cleared:
+        clear_refdata()
+        clear_schedule_cache()
+        clear_users_cache()  # группы удалены — group_id пользователей сброшен в NULL
+        clear_professor_index()
+        txt = "✅ Таблицы Faculty, Group, Lesson, Professor, ProfessorLesson успешно очищены."
+        await message.answer(txt)
+        logger.info(f"{txt} Удалено записей: {deleted_counts}")
+
+    await state.clear()
@@ -1,4 +1,5 @@
 import asyncio
+import hmac
 import logging
 
 from aiogram import Router, F
@@ -11,11 +12,20 @@ from app.database.models import User
 from app.config import settings
 from app.filters.is_admin import IsAdminFilter
 from app.keyboards.admin_kb import get_admin_kb
+from app.utils.messages.safe_delete_messages import safe_delete_message, safe_delete_many
 from app.state.states import ClearUsersTableStates
+from app.utils.cache.user_cache import clear_users_cache
+from app.utils.messages.send_messages import finalize_callback
+from app.utils.messages.tg_send_queue import enqueue
 
 logger = logging.getLogger(__name__)
 router = Router()
 
+# Клавиатура отмены удаления — создаётся один раз при загрузке модуля
+_CANCEL_DELETE_USERS_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_delete_users")]
+])
+
 
 @router.callback_query(F.data=="cancel_delete_users", IsAdminFilter())
 async def cancel_delete_users(callback: CallbackQuery, state: FSMContext):
@@ -24,26 +34,24 @@ async def cancel_delete_users(callback: CallbackQuery, state: FSMContext):
 
     Когда администратор нажимает кнопку «Отмена», состояние FSM очищается,
     сообщение с предупреждением заменяется текстом об отмене операции,
-    после чего сообщение автоматически удаляется через 1 секунду.
+    после чего через 1 секунду в фоне возвращается админ панель.
 
     Параметры:
         callback (CallbackQuery): Объект callback, содержащий данные нажатой кнопки.
         state (FSMContext): Контекст конечного автомата состояний (FSM).
 
     Логика работы:
-        - Отправляет пользователю сообщение об отмене операции.
-        - Удаляет сообщение после короткой задержки.
+        - Отвечает на callback и параллельно заменяет сообщение текстом об отмене операции.
+        - Ставит возврат к админ панели в очередь отправки с задержкой (хендлер не ждёт).
 
     Исключения:
         Exception: Логирует ошибки удаления сообщения, если Telegram API возвращает ошибку.
     """
 
     await state.clear()
-    await callback.message.edit_text("❌ Удаление БД с пользователями отменено")
-    await callback.answer()
+    await finalize_callback(callback, callback.message.edit_text("❌ Удаление БД с пользователями отменено"))
 
-    await asyncio.sleep(1)
-    await callback.message.edit_text(text="Админ панель:", reply_markup=get_admin_kb())
+    enqueue(lambda: callback.message.edit_text(text="Админ панель:", reply_markup=get_admin_kb()), delay=1)
 
 
 @router.callback_query(F.data=="clear_user_db", IsAdminFilter())
@@ -63,9 +71,7 @@ async def clear_user_db(callback: CallbackQuery, state: FSMContext):
 
     await callback.message.edit_text(
         text="⚠️ Эта операция удалит всех пользователей, кроме администраторов.\nВведите пароль для подтверждения:",
-        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_delete_users")]
-        ]))
+        reply_markup=_CANCEL_DELETE_USERS_KB)
 
     await callback.answer()
     await state.set_state(ClearUsersTableStates.confirm_delete)
@@ -88,7 +94,8 @@ async def confirm_delete_user(message: Message, state: FSMContext):
         state (FSMContext): Контекст FSM для хранения промежуточных данных (ID сообщений и состояния).
 
     Логика работы:
-        1. Удаляет предыдущее сообщение с запросом пароля (если оно есть).
+        1. Удаляет предыдущее сообщение с запросом пароля (если оно есть) и сообщение с паролем —
+           параллельно с дальнейшими шагами.
         2. Проверяет правильность введённого пароля.
            - Если пароль неверен — уведомляет и очищает состояние FSM.
         3. При успешной проверке подключается к базе данных.
@@ -106,50 +113,61 @@ async def confirm_delete_user(message: Message, state: FSMContext):
     data = await state.get_data()
     confirm_message_id = data.get('confirm_message_id')
 
-    if confirm_message_id:
-        try:
-            await message.bot.delete_message(chat_id=message.chat.id, message_id=confirm_message_id)
-        except Exception as e:
-            logger.debug(f"Не удалось удалить сообщение с подтверждением очистки БД: {e}")
-
-    try:
-        await message.delete()
-    except Exception as e:
-        logger.debug(f"⚠️ Не удалось удалить сообщение пользователя с паролем: {e}")
+    # Удаление сообщений не зависит от результата проверки пароля и работы с БД,
+    # поэтому выполняется параллельно с ними
+    cleanup = safe_delete_many((message.chat.id, confirm_message_id), message)
 
-    if message.text != settings.ADMIN_PASSWORD:
+    # Сравнение за постоянное время; байты — т.к. для str compare_digest принимает только ASCII
+    if not hmac.compare_digest((message.text or "").encode(), settings.ADMIN_PASSWORD.encode()):
         logger.warning("❌ Попытка очистки базы с неверным паролем.")
 
-        try:
-            msg = await message.answer("❌ Неверный пароль")
-
-            await asyncio.sleep(1)
+        _, msg = await asyncio.gather(cleanup, message.answer("❌ Неверный пароль"), return_exceptions=True)
 
-            try:
-                await msg.delete()
-            except Exception as e:
-                logger.debug(f"⚠️ Не удалось удалить сообщение 'Неверный пароль': {e}")
-
-        except Exception as e:
-            logger.error(f"❌ Ошибка при отправке сообщения 'Неверный пароль': {e}")
+        if isinstance(msg, Exception):
+            logger.error(f"❌ Ошибка при отправке сообщения 'Неверный пароль': {msg}")
+        else:
+            enqueue(lambda: safe_delete_message(msg), delay=1)
 
         await state.clear()
         return
 
+    _, deleted_count = await asyncio.gather(cleanup, _delete_non_admin_users())
+
+    # Уведомление отправляется уже после закрытия сессии
+    if deleted_count is not None:
+        txt = f"✅ Из базы удалено {deleted_count} пользователей (остались только админы)."
+        await message.answer(txt)
+        logger.info(txt)
+
+    await state.clear()
+
+
+async def _delete_non_admin_users() -> int | None:
+    """
+    Удаляет из базы всех пользователей, кроме администраторов (`role != 1`).
+
+    Возвращает:
+        int | None: Количество удалённых пользователей или None при ошибке БД.
+    """
+
     async with AsyncSessionLocal() as session:
         try:
-            stmt = delete(User).where(User.role != 1)
+            # synchronize_session=False: объекты в сессии не сверяются с удаляемыми строками.
+            # RETURNING даёт точное число удалённых строк независимо от драйвера (rowcount в async-драйверах ненадёжен).
+            stmt = (
+                delete(User)
+                .where(User.role != 1)
+                .returning(User.id)
+                .execution_options(synchronize_session=False)
+            )
             result = await session.execute(stmt)
+            deleted_count = len(result.all())
             await session.commit()
+            clear_users_cache()
 
-            deleted_count = result.rowcount or 0
-
-            txt = f"✅ Из базы удалено {deleted_count} пользователей (остались только админы)."
-            await message.answer(txt)
-            logger.info(txt)
+            return deleted_count
 
         except Exception as e:
             await session.rollback()
             logger.error(f"❌ Ошибка при удалении пользователей: {e}")
-
-    await state.clear()
\ No newline at end of file
+            return None
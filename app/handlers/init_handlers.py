@@ -12,16 +12,25 @@ from app.handlers.schedule.professor_schedule import router as professor_schedul
 from app.handlers.schedule.bells_schedule import router as bells_schedule_router
 
 def register_handlers(dp: Dispatcher):
-    """Регистрирует роутеры с обработчиками сообщений и callback"""
+    """
+    Регистрирует роутеры с обработчиками сообщений и callback.
+
+    Dispatcher проверяет фильтры роутеров по порядку подключения, поэтому
+    роутеры идут по частоте обращений: сначала пользовательские сценарии
+    (старт, расписания, прочие функции), затем регистрация и в конце
+    административные разделы. Фильтры роутеров не пересекаются
+    (разные callback data, тексты кнопок и состояния FSM), поэтому
+    порядок влияет только на количество проверок.
+    """
 
     dp.include_router(start_router)
-    dp.include_router(sync_router)
     dp.include_router(schedule_router)
-    dp.include_router(registration_router)
     dp.include_router(my_schedule_router)
-    dp.include_router(admin_router)
+    dp.include_router(professor_schedule_router)
+    dp.include_router(bells_schedule_router)
     dp.include_router(other_functions_router)
+    dp.include_router(registration_router)
+    dp.include_router(admin_router)
+    dp.include_router(sync_router)
     dp.include_router(clear_users_router)
     dp.include_router(clean_other_tables_router)
-    dp.include_router(professor_schedule_router)
-    dp.include_router(bells_schedule_router)
\ No newline at end of file
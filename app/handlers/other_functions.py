@@ -1,79 +1,98 @@
+import asyncio
 import logging
 
 from aiogram.types import Message, CallbackQuery
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from sqlalchemy import delete, select
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import app.keyboards.registration_kb as registration_kb
-from app.database.db import AsyncSessionLocal
 from app.database.models import User
 from app.keyboards.main_menu_kb import get_main_menu_kb
+from app.middlewares.DbSessionMiddleware import DbSessionMiddleware
 from app.state.states import RegistrationStates
+from app.utils.cache.user_cache import invalidate_user
 from app.utils.messages.safe_delete_messages import safe_delete_message, safe_delete_callback_message
+from app.utils.messages.send_messages import finalize_callback
 
 router = Router()
 logger = logging.getLogger(__name__)
 
+# Сессия БД (параметр `session`) для выхода из профиля
+router.callback_query.middleware(DbSessionMiddleware())
+
+# Меню прочих функций статично — создаётся один раз при загрузке модуля
+_OTHER_FUNCTIONS_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="Изменить группу", callback_data="change_group_data")],
+        [InlineKeyboardButton(text="Выйти из профиля", callback_data="logout")],
+        [InlineKeyboardButton(text="Назад", callback_data="exit_other_functions")]
+    ]
+)
+
 
 @router.message(F.text == "Прочие функции")
 async def other_functions(message: Message):
     """Меню прочих функций"""
-    await safe_delete_message(message)
-
-    kb = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="Изменить группу", callback_data="change_group_data")],
-            [InlineKeyboardButton(text="Выйти из профиля", callback_data="logout")],
-            [InlineKeyboardButton(text="Назад", callback_data="exit_other_functions")]
-        ]
+    # Удаление и ответ — независимые запросы к Telegram, выполняем их параллельно
+    await asyncio.gather(
+        safe_delete_message(message),
+        message.answer(text="Выберите действие:", reply_markup=_OTHER_FUNCTIONS_KB),
+        return_exceptions=True
     )
 
-    await message.answer(text="Выберите действие:", reply_markup=kb)
-
 
 @router.callback_query(F.data == "change_group_data")
 async def change_personal_data(callback: CallbackQuery, state: FSMContext):
     """Запуск процесса изменения персональных данных"""
-    await callback.message.edit_text(text="Выберите ваш факультет:", reply_markup=registration_kb.faculty_keyboard_reg)
     await state.set_state(RegistrationStates.choice_faculty)
-    await callback.answer()
+    await finalize_callback(
+        callback,
+        callback.message.edit_text(text="Выберите ваш факультет:", reply_markup=registration_kb.faculty_keyboard_reg)
+    )
 
 @router.callback_query(F.data == "logout")
-async def logout_user(callback: CallbackQuery):
+async def logout_user(callback: CallbackQuery, session: AsyncSession):
     """Выход из профиля - удаление пользователя из базы данных"""
-    await safe_delete_callback_message(callback)
     try:
         user_id = callback.from_user.id
 
-        async with AsyncSessionLocal() as session:
-            # Проверяем, существует ли пользователь
-            query = await session.execute(select(User).where(User.id == user_id))
-            existing_user = query.scalars().first()
+        # Удаляем пользователя одним запросом: RETURNING показывает, существовал ли он
+        result = await session.execute(
+            delete(User).where(User.id == user_id).returning(User.id)
+        )
+        existed = result.scalar() is not None
+        await session.commit()
 
-            if not existing_user:
-                await callback.answer(text="❌ Вы не зарегистрированы!", show_alert=True)
-                return
+        if not existed:
+            await asyncio.gather(
+                safe_delete_message(callback.message),
+                callback.answer(text="❌ Вы не зарегистрированы!", show_alert=True),
+                return_exceptions=True
+            )
+            return
 
-            # Удаляем пользователя из базы данных
-            await session.execute(delete(User).where(User.id == user_id))
-            await session.commit()
+        invalidate_user(user_id)
 
         # Получаем клавиатуру для незарегистрированного пользователя
         updated_keyboard = await get_main_menu_kb(user_id)
 
-        # Отправляем новое сообщение с обновленной клавиатурой
-        await callback.message.answer(
-            text="✅ Вы вышли из профиля.\n\n"
-            "Теперь у вас доступен ограниченный функционал. "
-            "Для доступа ко всем функциям пройдите регистрацию.",
-            reply_markup=updated_keyboard
+        # Удаляем меню (с ответом на callback) и отправляем новое сообщение параллельно
+        await asyncio.gather(
+            safe_delete_callback_message(callback),
+            callback.message.answer(
+                text="✅ Вы вышли из профиля.\n\n"
+                "Теперь у вас доступен ограниченный функционал. "
+                "Для доступа ко всем функциям пройдите регистрацию.",
+                reply_markup=updated_keyboard
+            ),
+            return_exceptions=True
         )
-        await callback.answer()
 
-    except Exception as e:
-        logger.error(f"Ошибка при выходе из профиля: {e}", exc_info=True)
+    except Exception:
+        logger.exception("Ошибка при выходе из профиля")
         await callback.answer(text="❌ Произошла ошибка при выходе из профиля", show_alert=True)
 
 
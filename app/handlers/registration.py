@@ -1,24 +1,38 @@
+import asyncio
 import logging
 from aiogram import F, Router
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
 
-from app.database.db import AsyncSessionLocal
-from app.database.models import User, Group, Faculty
+from app.database.db import dialect_insert
+from app.database.models import User
 from app.keyboards.base_kb import abbr_faculty
+from app.keyboards.callback_factories import FacultyCallback, GroupCallback
 import app.keyboards.registration_kb as registration_kb
 from app.keyboards.main_menu_kb import get_main_menu_kb
+from app.middlewares.DbSessionMiddleware import DbSessionMiddleware
 from app.state.states import RegistrationStates
-from sqlalchemy import select
+from app.utils.cache.refdata import get_faculty_id, get_group_id
+from app.utils.cache.user_cache import UserInfo, get_user, invalidate_user
+from sqlalchemy import bindparam, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.utils.messages.safe_delete_messages import safe_delete_callback_message
 
 router = Router()
 logger = logging.getLogger(__name__)
 
+# Сессия БД (параметр `session`) для проверки и сохранения регистрации
+router.message.middleware(DbSessionMiddleware())
+router.callback_query.middleware(DbSessionMiddleware())
 
-@router.callback_query(F.data.startswith("cancel_"), F.data.endswith("_reg"))
+# Проверка регистрации выполняется на каждое нажатие "Регистрация": lambda_stmt строит выражение
+# и компилирует SQL один раз, дальше меняется только параметр user_id
+_USER_EXISTS_STMT = lambda_stmt(lambda: select(User.id).where(User.id == bindparam("user_id")))
+
+
+@router.callback_query(F.data.in_({"cancel_faculty_reg", "cancel_group_reg"}))
 async def cancel_registration(callback: CallbackQuery, state: FSMContext):
     """Отмена регистрации"""
     await state.clear()
@@ -26,14 +40,13 @@ async def cancel_registration(callback: CallbackQuery, state: FSMContext):
 
 
 @router.message(F.text == "Регистрация")
-async def start_registration(message: Message, state: FSMContext):
+async def start_registration(message: Message, state: FSMContext, session: AsyncSession):
     """Начало процесса регистрации с проверкой существующей регистрации"""
     # Проверяем, зарегистрирован ли пользователь
-    async with AsyncSessionLocal() as session:
-        query = await session.execute(select(User).where(User.id == message.from_user.id))
-        existing_user = query.scalars().first()
+    # Нужен только факт существования записи — выбираем ID, без загрузки ORM-объекта и связей
+    existing_user_id = await session.scalar(_USER_EXISTS_STMT, {"user_id": message.from_user.id})
 
-    if existing_user:
+    if existing_user_id is not None:
         # Пользователь уже зарегистрирован
         await message.answer(
             text="✅ Вы уже зарегистрированы!\n\n"
@@ -48,10 +61,10 @@ async def start_registration(message: Message, state: FSMContext):
     await state.set_state(RegistrationStates.choice_faculty)
 
 
-@router.callback_query(StateFilter(RegistrationStates.choice_faculty), F.data.startswith("faculty:"))
-async def registration_faculty(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(StateFilter(RegistrationStates.choice_faculty), FacultyCallback.filter())
+async def registration_faculty(callback: CallbackQuery, callback_data: FacultyCallback, state: FSMContext):
     """Обработка выбора факультета при регистрации"""
-    faculty_abbr = callback.data.split(":")[1]
+    faculty_abbr = callback_data.abbr
     faculty_name = abbr_faculty[faculty_abbr]
 
     groups_kb = registration_kb.groups_keyboards_reg.get(faculty_name)
@@ -67,66 +80,84 @@ async def registration_faculty(callback: CallbackQuery, state: FSMContext):
     await state.set_state(RegistrationStates.choice_group)
 
 
-@router.callback_query(StateFilter(RegistrationStates.choice_group), F.data.startswith("group:"))
-async def registration_group(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(StateFilter(RegistrationStates.choice_group), GroupCallback.filter())
+async def registration_group(callback: CallbackQuery, callback_data: GroupCallback, state: FSMContext, session: AsyncSession):
     """Завершение регистрации - сохранение пользователя"""
-    group_name = callback.data.split(":")[1]
+    group_name = callback_data.name
     state_data = await state.get_data()
     faculty_name = state_data.get("faculty_name")
 
     try:
-        async with AsyncSessionLocal() as session:
-            # Находим группу и факультет в базе
-            query = await session.execute(select(Group).where(Group.group_name == group_name))
-            group = query.scalars().first()
-
-            query = await session.execute(select(Faculty).where(Faculty.name == faculty_name))
-            faculty = query.scalars().first()
-
-            if not group or not faculty:
-                await callback.message.edit_text("❌ Ошибка: группа или факультет не найдены.")
-                return
-
-            # Проверяем, есть ли уже пользователь
-            query = await session.execute(select(User).where(User.id == callback.from_user.id))
-            existing_user = query.scalars().first()
-
-            if existing_user:
-                # Обновляем существующего пользователя
-                existing_user.group_id = group.id
-                existing_user.faculty_id = faculty.id
-                action_text = "Данные обновлены!"
-                success_message = f"✅ Данные обновлены!\nФакультет: {faculty_name}\nГруппа: {group_name}"
-            else:
-                # Создаем нового пользователя
-                user = User(
-                    id=callback.from_user.id,
-                    group_id=group.id,
-                    faculty_id=faculty.id
-                )
-                session.add(user)
-                action_text = "Регистрация завершена!"
-                success_message = (
-                    f"✅ Регистрация завершена!\n"
-                    f"Факультет: {faculty_name}\n"
-                    f"Группа: {group_name}\n\n"
-                    f"Теперь вы можете быстро просматривать своё расписание"
-                )
-
-            await session.commit()
-
-        # Получаем обновленную клавиатуру для зарегистрированного пользователя
-        updated_keyboard = await get_main_menu_kb(callback.from_user.id)
-
-        # Отправляем сообщение с обновленной клавиатурой
-        await callback.message.answer(success_message, reply_markup=updated_keyboard)
-
-        # Редактируем предыдущее сообщение, чтобы убрать инлайн-клавиатуру
-        await callback.message.edit_text(f"✅ {action_text}")
-        await callback.answer()
-
-    except Exception as e:
-        logger.error(f"Ошибка при регистрации пользователя: {e}")
+        # ID группы и факультета берутся из справочника в памяти, статус пользователя — из кэша.
+        # Поиски независимы (при промахе кэша каждый открывает свою сессию), поэтому выполняются параллельно.
+        group_id, faculty_id, user = await asyncio.gather(
+            get_group_id(group_name),
+            get_faculty_id(faculty_name),
+            get_user(callback.from_user.id)
+        )
+
+        if group_id is None or faculty_id is None:
+            await callback.message.edit_text("❌ Ошибка: группа или факультет не найдены.")
+            return
+
+        if user is not None:
+            success_message = f"✅ Данные обновлены!\nФакультет: {faculty_name}\nГруппа: {group_name}"
+        else:
+            success_message = (
+                f"✅ Регистрация завершена!\n"
+                f"Факультет: {faculty_name}\n"
+                f"Группа: {group_name}\n\n"
+                f"Теперь вы можете быстро просматривать своё расписание"
+            )
+
+        # Один атомарный запрос вместо SELECT + INSERT/UPDATE: роль существующего пользователя не меняется
+        stmt = dialect_insert(User).values(
+            id=callback.from_user.id,
+            group_id=group_id,
+            faculty_id=faculty_id
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.id],
+            set_={"group_id": stmt.excluded.group_id, "faculty_id": stmt.excluded.faculty_id}
+        )
+
+        await session.execute(stmt)
+        await session.commit()
+
+        invalidate_user(callback.from_user.id)
+
+        # Данные пользователя после записи известны без повторного запроса:
+        # роль существующего пользователя не меняется, новый получает роль по умолчанию
+        registered_user = UserInfo(
+            id=callback.from_user.id,
+            role=user.role if user is not None else 0,
+            group_id=group_id,
+            group_name=group_name
+        )
+        updated_keyboard = await get_main_menu_kb(callback.from_user.id, prefetched=registered_user)
+
+        # Reply-клавиатуру нельзя прикрепить правкой, поэтому итог отправляется новым сообщением,
+        # а у предыдущего только убирается инлайн-клавиатура (легче полной правки текста).
+        # Запросы независимы и отправляются параллельно вместе с ответом на callback
+        results = await asyncio.gather(
+            callback.message.answer(success_message, reply_markup=updated_keyboard),
+            callback.message.edit_reply_markup(reply_markup=None),
+            callback.answer(),
+            return_exceptions=True
+        )
+
+        # Регистрация уже сохранена — ошибки отправки только логируются
+        sent, unmarked, answered = results
+        if isinstance(sent, Exception):
+            logger.error("❌ Регистрация пользователя %s сохранена, но подтверждение не отправлено: %r",
+                         callback.from_user.id, sent)
+        for result in (unmarked, answered):
+            if isinstance(result, Exception):
+                logger.warning("⚠️ Не удалось завершить callback регистрации пользователя %s: %r",
+                               callback.from_user.id, result)
+
+    except Exception:
+        logger.exception("Ошибка при регистрации пользователя")
         await callback.message.edit_text("❌ Ошибка при регистрации. Попробуйте позже.")
     finally:
         await state.clear()
\ No newline at end of file
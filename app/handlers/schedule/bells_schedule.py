@@ -6,27 +6,29 @@ from app.keyboards.schedule_kb import get_other_schedules_kb
 
 router = Router()
 
+# Расписание звонков не меняется — текст и клавиатура собираются один раз при импорте
+_BELLS_TEXT = (
+    "🔔 <b>Расписание звонков:</b>\n\n"
+    "• 1 пара: 8:30 - 10:05\n"
+    "• 2 пара: 10:15 - 11:50\n"
+    "• 3 пара: 12:10 - 13:45\n"
+    "• 4 пара: 14:00 - 15:35\n"
+    "• 5 пара: 15:55 - 17:30\n"
+    "• 6 пара: 17:45 - 19:20\n"
+    "• 7 пара: 19:30 - 21:00"
+)
+
+_BELLS_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_other_schedules")]
+    ]
+)
+
+
 @router.callback_query(F.data == "bells_schedule")
 async def show_bells_schedule(callback: CallbackQuery):
     """Показывает полное расписание звонков"""
-    bells_schedule = (
-        "🔔 *Расписание звонков:*\n\n"
-        "• 1 пара: 8:30 - 10:05\n"
-        "• 2 пара: 10:15 - 11:50\n"
-        "• 3 пара: 12:10 - 13:45\n"
-        "• 4 пара: 14:00 - 15:35\n"
-        "• 5 пара: 15:55 - 17:30\n"
-        "• 6 пара: 17:45 - 19:20\n"
-        "• 7 пара: 19:30 - 21:00"
-    )
-
-    kb = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_other_schedules")]
-        ]
-    )
-
-    await callback.message.edit_text(bells_schedule, reply_markup=kb, parse_mode="Markdown")
+    await callback.message.edit_text(_BELLS_TEXT, reply_markup=_BELLS_KB, parse_mode="HTML")
     await callback.answer()
 
 
@@ -37,4 +39,4 @@ async def back_to_other_schedules(callback: CallbackQuery):
         text="Выберите расписание которое хотите посмотреть:",
         reply_markup=get_other_schedules_kb()
     )
-    await callback.answer()
\ No newline at end of file
+    await callback.answer()
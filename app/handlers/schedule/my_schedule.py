@@ -3,12 +3,9 @@ from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, KeyboardButton, ReplyKeyboardMarkup
 
-from app.database.db import AsyncSessionLocal
-from app.database.models import User
 from app.keyboards.schedule_kb import get_choice_week_type_kb
-from app.state.states import ShowScheduleStates
-from sqlalchemy import select
-import app.utils.week_mark.week_mark as week_mark
+from app.handlers.schedule.student_schedule import start_week_choice
+from app.utils.cache.user_cache import get_user
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -18,11 +15,9 @@ logger = logging.getLogger(__name__)
 async def show_my_schedule_start(message: Message, state: FSMContext):
     """Начало показа расписания для зарегистрированного пользователя"""
 
-    async with AsyncSessionLocal() as session:
-        query = await session.execute(select(User).where(User.id == message.from_user.id))
-        user = query.scalars().first()
+    user = await get_user(message.from_user.id)
 
-    if not user:
+    if user is None or user.group_name is None:
         await message.answer(
             text="❌ Вы не зарегистрированы. Пожалуйста, пройдите регистрацию сначала.",
             reply_markup=ReplyKeyboardMarkup(
@@ -32,9 +27,5 @@ async def show_my_schedule_start(message: Message, state: FSMContext):
         )
         return
 
-    await state.update_data(group_name=user.group.group_name)
-    await state.set_state(ShowScheduleStates.choice_week)
-
-    await message.answer(text=f"Выберите тип расписания:\n"
-                         f"Сейчас неделя {week_mark.WEEK_MARK_STICKER}",
-                         reply_markup=get_choice_week_type_kb())
\ No newline at end of file
+    text = await start_week_choice(state, user.group_name)
+    await message.answer(text=text, reply_markup=get_choice_week_type_kb())
\ No newline at end of file
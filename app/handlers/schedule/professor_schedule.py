@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import re
 from datetime import datetime
 
 from aiogram import F, Router
@@ -11,10 +13,12 @@ from app.keyboards.schedule_kb import get_other_schedules_kb
 from app.state.states import ProfessorScheduleStates
 from app.utils.custom_logging.TelegramLogHandler import send_chat_info_log
 from app.utils.messages.safe_delete_messages import safe_delete_callback_message, safe_delete_message
-from app.utils.schedule.schedule_formatter import format_schedule_professor, escape_md_v2
+from app.utils.messages.send_messages import answer_messages
+from app.utils.messages.tg_send_queue import enqueue
+from app.utils.schedule.schedule_formatter import WEEKDAY_NAMES, format_schedule_professor, escape_md_v2
 from app.utils.schedule.search_professors import search_professors_fuzzy
 from app.utils.schedule.sync_lock import is_sync_running
-from app.utils.schedule.worker import get_lesson_for_professor
+from app.utils.schedule.worker import get_professor_schedule
 from app.keyboards.schedule_kb import get_schedule_professors_kb
 import app.utils.week_mark.week_mark as week_mark
 
@@ -22,39 +26,62 @@ import app.utils.week_mark.week_mark as week_mark
 router = Router()
 logger = logging.getLogger(__name__)
 
-
-async def get_professor_schedule_for_today(professor_name: str):
+# Подписи типов недели для уведомления после показа расписания
+_WEEK_NAMES = {
+    "plus": "➕ Неделя",
+    "minus": "➖ Неделя",
+    "full": "🗓 Вся неделя"
+}
+
+# Тип недели для фильтра «сегодня»: всё, кроме «plus», считается «minus»
+_WEEK_FILTERS = {"plus": "plus", "minus": "minus"}
+
+# Маркеры пар, идущих в неделю данного типа (пары без маркера идут каждую неделю)
+_TODAY_ALLOWED_MARKS = {
+    "plus": frozenset(("plus", "every", None)),
+    "minus": frozenset(("minus", "every", None)),
+}
+
+# Разбор callback data кнопок выбора типа расписания (ID преподавателя — только цифры)
+_SELECT_PROF_RE = re.compile(r"^select_prof:(\d+)$")
+_PROF_TODAY_RE = re.compile(r"^prof_today:(\d+)$")
+_PROF_WEEK_RE = re.compile(r"^prof_week_(plus|minus|full):(\d+)$")
+# Кнопки преподавателей с другим содержимым (например, с именем вместо ID в сообщениях,
+# отправленных старой версией бота) — обработчик регистрируется последним и просит повторить поиск
+_STALE_PROF_RE = re.compile(r"^(select_prof|prof_today|prof_week_\w+):")
+
+# Статическая клавиатура «Назад» — создаётся один раз при загрузке модуля.
+# Её ряд также замыкает клавиатуру выбора преподавателя
+_CANCEL_ROW = [InlineKeyboardButton(text="◀️ Назад", callback_data="cancel")]
+_CANCEL_KB = InlineKeyboardMarkup(inline_keyboard=[_CANCEL_ROW])
+
+
+async def get_professor_schedule_for_today(professor_id: int):
     """
     Получает расписание преподавателя на сегодня.
 
+    Пары берутся из кэша расписания преподавателя (общего с расписанием на неделю)
+    и отбираются по дню недели и типу недели.
+
     Параметры:
-        professor_name (str): Имя преподавателя
+        professor_id (int): ID преподавателя
 
     Возвращает:
-        Tuple[Professor, List, List, str]:
+        Tuple[Professor, List, str]:
             - Professor объект или None
-            - Все занятия преподавателя
-            - Отфильтрованные занятия на сегодня
+            - Занятия на сегодня с учётом типа недели
             - Текущий тип недели
     """
 
     current_weekday = datetime.now().isoweekday()
-    professor, all_lessons = await get_lesson_for_professor(professor_name)
-
-    if not professor or not all_lessons:
-        return professor, all_lessons, [], ""
+    week_filter = _WEEK_FILTERS.get(week_mark.WEEK_MARK_TXT, "minus")
 
-    today_lessons = [lesson for lesson in all_lessons if lesson.weekday == current_weekday]
+    allowed = _TODAY_ALLOWED_MARKS[week_filter]
 
-    current_week = week_mark.WEEK_MARK_TXT
-    week_filter = "plus" if current_week == "plus" else "minus"
+    professor, lessons = await get_professor_schedule(professor_id)
+    filtered_lessons = [l for l in lessons if l.weekday == current_weekday and l.week_mark in allowed]
 
-    filtered_lessons = [
-        lesson for lesson in today_lessons
-        if lesson.week_mark in (week_filter, "every", None)
-    ]
-
-    return professor, all_lessons, filtered_lessons, week_filter
+    return professor, filtered_lessons, week_filter
 
 
 async def format_and_send_schedule(target, professor_name: str, professor, filtered_lessons, week_filter, reply_markup):
@@ -64,7 +91,7 @@ async def format_and_send_schedule(target, professor_name: str, professor, filte
     Функция принимает уже отфильтрованные занятия преподавателя, преобразует их
     в список текстовых сообщений (через `format_schedule_professor`) и отправляет
     пользователю. Если расписание не помещается в одно сообщение, оно разбивается
-    на несколько с предупреждением в логах.
+    на несколько (отправляются по порядку, клавиатура — под последним) с предупреждением в логах.
 
     Параметры:
         target (Message | CallbackQuery.message): Объект для отправки сообщений.
@@ -87,19 +114,18 @@ async def format_and_send_schedule(target, professor_name: str, professor, filte
 
     len_messages = len(messages)
     if len_messages > 1:
-        try:
-            await send_chat_info_log(f"Расписание преподавателя {professor_name} не уместилось в одно сообщение. Проверить!!!")
-        except Exception as e:
-            logger.warning(f"⚠️ Не удалось отправить сообщение в Telegram: {e}")
-
-    for i, msg_text in enumerate(messages):
-        is_last = (i == len_messages - 1)
-        await target.answer(
-            msg_text,
-            reply_markup=reply_markup if is_last else None,
-            parse_mode="MarkdownV2",
-            disable_web_page_preview=True
-        )
+        # Служебное уведомление не задерживает ответ пользователю — отправляется воркером очереди
+        enqueue(lambda: send_chat_info_log(
+            f"Расписание преподавателя {professor_name} не уместилось в одно сообщение. Проверить!!!"
+        ))
+
+    await answer_messages(
+        target,
+        messages,
+        reply_markup=reply_markup,
+        parse_mode="MarkdownV2",
+        disable_web_page_preview=True
+    )
 
 
 async def send_no_lessons_message(target, professor_name: str, professor=None, reply_markup=None):
@@ -118,13 +144,7 @@ async def send_no_lessons_message(target, professor_name: str, professor=None, r
 
     """
 
-    weekday_names = {
-        1: "Понедельник", 2: "Вторник", 3: "Среда",
-        4: "Четверг", 5: "Пятница", 6: "Суббота", 7: "Воскресенье"
-    }
-
-    current_weekday = datetime.now().isoweekday()
-    day_name = weekday_names.get(current_weekday, "сегодня")
+    day_name = WEEKDAY_NAMES[datetime.now().isoweekday()]
 
     name_to_display = professor.name if professor else professor_name
 
@@ -141,18 +161,20 @@ async def send_no_lessons_message(target, professor_name: str, professor=None, r
     )
 
 
-async def show_professor_schedule_menu(message: Message, professor_name: str, state: FSMContext):
+async def show_professor_schedule_menu(message: Message, professor_id: int, state: FSMContext,
+                                       professor_name: str | None = None):
     """
     Показывает пользователю меню выбора типа расписания преподавателя и автоматически отображает расписание на сегодня.
 
-    При первом вызове сохраняет имя преподавателя в состояние FSM,
+    При первом вызове сохраняет ID преподавателя в состояние FSM,
     создает inline-клавиатуру и пытается сразу показать расписание на текущий день.
     Если занятий нет, сообщает пользователю об этом.
 
     Параметры:
         message (Message): Объект входящего сообщения от пользователя.
-        professor_name (str): Имя преподавателя, для которого запрашивается расписание.
+        professor_id (int): ID преподавателя, для которого запрашивается расписание.
         state (FSMContext): Контекст состояний FSM для сохранения данных.
+        professor_name (str | None): Имя преподавателя, если уже известно (для сообщений об ошибках).
 
     Исключения:
         Exception: Если возникла ошибка при получении или отправке расписания.
@@ -165,11 +187,13 @@ async def show_professor_schedule_menu(message: Message, professor_name: str, st
         await state.clear()
         return
     
-    await state.update_data(professor_name=professor_name)
-    schedule_type_kb = get_schedule_professors_kb(professor_name)
+    await state.update_data(professor_id=professor_id)
+    schedule_type_kb = get_schedule_professors_kb(professor_id)
 
     try:
-        professor, all_lessons, filtered_lessons, week_filter = await get_professor_schedule_for_today(professor_name)
+        professor, filtered_lessons, week_filter = await get_professor_schedule_for_today(professor_id)
+        if professor:
+            professor_name = professor.name
 
         if professor and filtered_lessons:
             await format_and_send_schedule(
@@ -182,12 +206,12 @@ async def show_professor_schedule_menu(message: Message, professor_name: str, st
             )
             return
 
-        await send_no_lessons_message(message, professor_name, professor, schedule_type_kb)
+        await send_no_lessons_message(message, professor_name or "", professor, schedule_type_kb)
 
-    except Exception as e:
-        logger.error(f"Ошибка при получении расписания на сегодня для {professor_name}: {e}")
+    except Exception:
+        logger.exception("Ошибка при получении расписания на сегодня для преподавателя %s (id=%s)", professor_name, professor_id)
         await message.answer(
-            text=f"👨‍🏫 *Преподаватель: {escape_md_v2(professor_name)}*\n\nВыберите тип расписания:",
+            text=f"👨‍🏫 *Преподаватель: {escape_md_v2(professor_name or '')}*\n\nВыберите тип расписания:",
             reply_markup=schedule_type_kb,
             parse_mode="MarkdownV2"
         )
@@ -202,19 +226,11 @@ async def show_professor_selection_keyboard(message: Message, professors: list[P
         professors (list[Professor]): Список найденных преподавателей
         query (str): Исходный поисковый запрос
     """
-    keyboard = []
-
-    for professor in professors:
-        keyboard.append([
-            InlineKeyboardButton(
-                text=f"👨‍🏫 {professor.name}",
-                callback_data=f"select_prof:{professor.name}"
-            )
-        ])
-
-    keyboard.append([
-        InlineKeyboardButton(text="◀️ Назад", callback_data="cancel")
-    ])
+    keyboard = [
+        [InlineKeyboardButton(text=f"👨‍🏫 {professor.name}", callback_data=f"select_prof:{professor.id}")]
+        for professor in professors
+    ]
+    keyboard.append(_CANCEL_ROW)
 
     selection_kb = InlineKeyboardMarkup(inline_keyboard=keyboard)
 
@@ -279,15 +295,10 @@ async def professor_schedule(callback: CallbackQuery, state: FSMContext):
         await state.clear()
         return
 
-    cancel_kb = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="◀️ Назад", callback_data="cancel")]
-        ])
-
     await callback.message.edit_text(
         text="👨‍🏫 Введите фамилию и инициалы преподавателя:\n\n"
              "Например: `Иванов И И`",
-        reply_markup=cancel_kb,
+        reply_markup=_CANCEL_KB,
         parse_mode="MarkdownV2"
     )
 
@@ -311,11 +322,6 @@ async def waiting_name(message: Message, state: FSMContext):
         state (FSMContext): Контекст FSM, содержащий данные, сохранённые ранее.
     """
 
-    cancel_kb = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="◀️ Назад", callback_data="cancel")]
-        ])
-
     await safe_delete_message(message)
 
     data = await state.get_data()
@@ -324,7 +330,7 @@ async def waiting_name(message: Message, state: FSMContext):
         try:
             await message.bot.delete_message(chat_id=message.chat.id, message_id=message_id_to_delete)
         except Exception as e:
-            logger.debug(f"⚠️ Не удалось удалить сообщение c именем преподавателя: {e}")
+            logger.debug("⚠️ Не удалось удалить сообщение c именем преподавателя: %s", e)
 
     if is_sync_running():
         await message.answer(
@@ -338,14 +344,14 @@ async def waiting_name(message: Message, state: FSMContext):
     exact_professor, similar_professors = await search_professors_fuzzy(query=name, limit=5, score_cutoff=85.0)
 
     if exact_professor:
-        await show_professor_schedule_menu(message, exact_professor.name, state)
+        await show_professor_schedule_menu(message, exact_professor.id, state, exact_professor.name)
         return
 
     if not similar_professors:
         msg = await message.answer(
             text=f"❌ Преподаватель `{escape_md_v2(name)}` не найден\\.\n\n"
                  "Проверьте написание и попробуйте снова\\.",
-            reply_markup=cancel_kb,
+            reply_markup=_CANCEL_KB,
             parse_mode="MarkdownV2"
         )
 
@@ -355,7 +361,7 @@ async def waiting_name(message: Message, state: FSMContext):
 
     if len(similar_professors) == 1:
         best_match = similar_professors[0]
-        await show_professor_schedule_menu(message, best_match.name, state)
+        await show_professor_schedule_menu(message, best_match.id, state, best_match.name)
         await state.clear()
         return
 
@@ -363,34 +369,36 @@ async def waiting_name(message: Message, state: FSMContext):
     await state.clear()
 
 
-@router.callback_query(F.data.startswith("select_prof:"))
-async def handle_professor_selection(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(F.data.regexp(_SELECT_PROF_RE).as_("match"))
+async def handle_professor_selection(callback: CallbackQuery, state: FSMContext, match: re.Match):
     """
     Обработчик выбора преподавателя из списка.
 
     Параметры:
         callback (CallbackQuery): Callback с выбранным преподавателем
         state (FSMContext): Контекст состояния
+        match (re.Match): Результат разбора callback data (группа 1 — ID преподавателя).
     """
 
-    professor_name = callback.data.split(":")[1]
+    professor_id = int(match.group(1))
 
     await safe_delete_callback_message(callback)
-    await show_professor_schedule_menu(callback.message, professor_name, state)
+    await show_professor_schedule_menu(callback.message, professor_id, state)
 
 
-@router.callback_query(F.data.startswith("prof_today:"))
-async def handle_professor_today(callback: CallbackQuery):
+@router.callback_query(F.data.regexp(_PROF_TODAY_RE).as_("match"))
+async def handle_professor_today(callback: CallbackQuery, match: re.Match):
     """
     Обрабатывает запрос пользователя на показ расписания преподавателя на текущий день.
 
-    Извлекает имя преподавателя из callback data, получает данные о расписании
+    Извлекает ID преподавателя из callback data, получает данные о расписании
     через функцию `get_professor_schedule_for_today`, фильтрует занятия по текущему дню,
     форматирует и отправляет их пользователю. Если занятий нет, отображает
     соответствующее уведомление.
 
     Параметры:
         callback (CallbackQuery): Объект callback-запроса от пользователя.
+        match (re.Match): Результат разбора callback data (группа 1 — ID преподавателя).
 
     Исключения:
         Exception: Если произошла ошибка при загрузке или форматировании расписания.
@@ -402,52 +410,51 @@ async def handle_professor_today(callback: CallbackQuery):
         await callback.answer()
         return
     
+    professor_id = None
     professor_name = ""
     try:
-        professor_name = callback.data.split(":")[1]
-        professor, all_lessons, filtered_lessons, week_filter = await get_professor_schedule_for_today(professor_name)
+        professor_id = int(match.group(1))
+        professor, filtered_lessons, week_filter = await get_professor_schedule_for_today(professor_id)
 
         if not professor:
-            await callback.message.edit_text(f"❌ Преподаватель {professor_name} не найден.")
+            await callback.message.edit_text("❌ Преподаватель не найден.")
             await callback.answer()
             return
 
-        if not all_lessons:
-            await callback.message.edit_text(f"❌ Нет расписания для преподавателя {professor_name}.")
-            await callback.answer()
-            return
-
-        try:
-            await callback.message.delete()
-        except Exception as delete_error:
-            logger.debug(f"Не удалось удалить сообщение: {delete_error}")
-
-        schedule_type_kb = get_schedule_professors_kb(professor_name)
+        professor_name = professor.name
+        schedule_type_kb = get_schedule_professors_kb(professor_id)
 
+        # Старое сообщение удаляется параллельно с отправкой нового — удаление не задерживает ответ
         if not filtered_lessons:
-            await send_no_lessons_message(callback.message, professor_name, professor, schedule_type_kb)
+            await asyncio.gather(
+                safe_delete_message(callback.message),
+                send_no_lessons_message(callback.message, professor_name, professor, schedule_type_kb)
+            )
             await callback.answer(f"Сегодня нет пар у {professor.name}")
             return
 
-        await format_and_send_schedule(
-            target=callback.message,
-            professor_name=professor_name,
-            professor=professor,
-            filtered_lessons=filtered_lessons,
-            week_filter=week_filter,
-            reply_markup=schedule_type_kb
+        await asyncio.gather(
+            safe_delete_message(callback.message),
+            format_and_send_schedule(
+                target=callback.message,
+                professor_name=professor_name,
+                professor=professor,
+                filtered_lessons=filtered_lessons,
+                week_filter=week_filter,
+                reply_markup=schedule_type_kb
+            )
         )
 
         await callback.answer(f"📅 Сегодня {week_mark.WEEK_MARK_STICKER}")
 
-    except Exception as e:
-        logger.error(f"Ошибка при показе расписания на сегодня преподавателя {professor_name}: {e}")
+    except Exception:
+        logger.exception("Ошибка при показе расписания на сегодня преподавателя %s (id=%s)", professor_name, professor_id)
         await callback.message.edit_text(f"❌ Ошибка при загрузке расписания преподавателя {professor_name}")
         await callback.answer()
 
 
-@router.callback_query(F.data.startswith("prof_week_"))
-async def handle_professor_week(callback: CallbackQuery):
+@router.callback_query(F.data.regexp(_PROF_WEEK_RE).as_("match"))
+async def handle_professor_week(callback: CallbackQuery, match: re.Match):
     """
     Обработчик показа расписания преподавателя на неделю.
 
@@ -455,12 +462,13 @@ async def handle_professor_week(callback: CallbackQuery):
     формирует расписание преподавателя и отправляет пользователю.
 
     Параметры:
-        callback (CallbackQuery): Callback-запрос с данными в формате "prof_week_[тип]:Фамилия И.О.".
+        callback (CallbackQuery): Callback-запрос с данными в формате "prof_week_[тип]:ID преподавателя".
             Где тип может быть "plus", "minus" или "full".
+        match (re.Match): Результат разбора callback data (группа 1 — тип недели, группа 2 — ID преподавателя).
 
     Логика:
-        1. Извлекает тип недели и имя преподавателя из callback data.
-        2. Получает занятия через `get_lesson_for_professor`.
+        1. Извлекает тип недели и ID преподавателя из callback data.
+        2. Получает занятия через `get_professor_schedule` (кэш, общий с расписанием на сегодня).
         3. Форматирует расписание в зависимости от выбранного типа недели.
         4. Отправляет одно или несколько сообщений с результатом.
 
@@ -475,30 +483,26 @@ async def handle_professor_week(callback: CallbackQuery):
         await callback.answer()
         return
 
+    professor_id = None
     professor_name = ""
     try:
-        data_parts = callback.data.split(":")
-        week_type = data_parts[0].replace("prof_week_", "")
-        professor_name = data_parts[1]
+        week_type = match.group(1)
+        professor_id = int(match.group(2))
 
-        professor, lessons = await get_lesson_for_professor(professor_name)
+        professor, lessons = await get_professor_schedule(professor_id)
 
         if not professor:
-            await callback.message.edit_text(f"❌ Преподаватель {professor} не найден.")
+            await callback.message.edit_text("❌ Преподаватель не найден.")
             await callback.answer()
             return
 
+        professor_name = professor.name
+
         if not lessons:
             await callback.message.edit_text(f"❌ Нет расписания для преподавателя {professor_name}")
             await callback.answer()
             return
 
-        week_names = {
-            "plus": "➕ Неделя",
-            "minus": "➖ Неделя",
-            "full": "🗓 Вся неделя"
-        }
-
         if week_type == "full":
             header_prefix = f"👨‍🏫 Расписание преподавателя {professor.name}"
         else:
@@ -515,23 +519,39 @@ async def handle_professor_week(callback: CallbackQuery):
         if messages:
             len_messages = len(messages)
             if len_messages > 1:
-                logger.warning(f"Расписание преподавателя {professor_name} не уместилось в одно сообщение. Проверить!!!")
-
-            for i, msg_text in enumerate(messages):
-                is_last = (i == len_messages - 1)
-                await callback.message.answer(
-                    msg_text,
-                    reply_markup=callback.message.reply_markup if is_last else None,
-                    parse_mode="MarkdownV2",
-                    disable_web_page_preview=True
-                )
-
-            await callback.answer(week_names.get(week_type, "🗓 Неделя"))
+                logger.warning("Расписание преподавателя %s не уместилось в одно сообщение. Проверить!!!", professor_name)
+
+            # Части отправляются по порядку, клавиатура прикрепляется к последней
+            await answer_messages(
+                callback.message,
+                messages,
+                reply_markup=callback.message.reply_markup,
+                parse_mode="MarkdownV2",
+                disable_web_page_preview=True
+            )
+
+            await callback.answer(_WEEK_NAMES.get(week_type, "🗓 Неделя"))
         else:
             await callback.message.answer("❌ Не удалось сформировать расписание.")
             await callback.answer()
 
-    except Exception as e:
-        logger.error(f"Ошибка при показе расписания преподавателя {professor_name}: {e}.")
+    except Exception:
+        logger.exception("Ошибка при показе расписания преподавателя %s (id=%s)", professor_name, professor_id)
         await callback.message.edit_text(f"❌ Ошибка при загрузке расписания преподавателя {professor_name}")
-        await callback.answer()
\ No newline at end of file
+        await callback.answer()
+
+
+@router.callback_query(F.data.regexp(_STALE_PROF_RE))
+async def handle_stale_professor_button(callback: CallbackQuery):
+    """
+    Отвечает на нажатие устаревшей кнопки преподавателя.
+
+    Срабатывает только для callback data, не подошедших обработчикам выше
+    (например, кнопки с именем преподавателя вместо ID из старых сообщений),
+    чтобы callback не оставался без ответа.
+
+    Параметры:
+        callback (CallbackQuery): Callback-запрос с устаревшими данными кнопки.
+    """
+
+    await callback.answer("⚠️ Кнопка устарела. Найдите преподавателя заново через «Расписание преподавателя».", show_alert=True)
@@ -6,7 +6,6 @@
 import logging
 import datetime
 
-from sqlalchemy import select
 from aiogram import F, Router
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
@@ -15,22 +14,28 @@ from aiogram.types import Message, CallbackQuery
 import app.utils.week_mark.week_mark as week_mark
 from app.utils.messages.safe_delete_messages import safe_delete_callback_message, safe_delete_message
 from app.utils.schedule.sync_lock import is_sync_running
-from app.utils.schedule.worker import get_schedule_for_group
-from app.keyboards.base_kb import abbr_faculty
+from app.utils.messages.send_messages import answer_messages, finalize_callback
+from app.utils.schedule.worker import get_schedule_days, get_schedule_for_group
+from app.utils.cache.schedule_cache import get_rendered_schedule, set_rendered_schedule
+from app.utils.cache.ttl_cache import TTLCache
+from app.utils.cache.user_cache import get_user
+from app.keyboards.callback_factories import FacultyCallback, GroupCallback, WeekCallback
 import app.keyboards.find_kb as find_kb
 from app.keyboards.schedule_kb import get_choice_week_type_kb
 from app.state.states import ShowScheduleStates
-from app.utils.schedule.schedule_formatter import escape_md_v2, format_schedule_students
+from app.utils.schedule.schedule_formatter import escape_md_v2, format_student_days
 from app.keyboards.schedule_kb import get_other_schedules_kb
-from app.database.db import AsyncSessionLocal
-from app.database.models import User, Lesson
 
 
 router = Router()
 logger = logging.getLogger(__name__)
 
+# Сообщения с выбором недели, по которым расписание уже отправляется: повторное нажатие
+# (двойной тап, нажатия во время отправки) в течение нескольких секунд не отправляет его ещё раз
+_week_choice_sent = TTLCache(maxsize=10_000, ttl=5)  # {(chat_id, message_id): True}
 
-@router.callback_query(F.data.startswith("cancel_"), F.data.endswith("_find"))
+
+@router.callback_query(F.data.in_({"cancel_faculty_find", "cancel_group_find"}))
 async def cancel_find(callback: CallbackQuery, state: FSMContext):
     """
     Обработка отмены поиска.
@@ -48,7 +53,7 @@ async def cancel_find(callback: CallbackQuery, state: FSMContext):
             reply_markup=get_other_schedules_kb()
         )
     except Exception as e:
-        logger.error(f"Не удалось изменить сообщение: {e}")
+        logger.error("Не удалось изменить сообщение: %s", e)
 
 
 @router.callback_query(F.data=="exit_other_schedules")
@@ -96,7 +101,7 @@ async def get_schedule_start(callback: CallbackQuery, state: FSMContext):
 async def get_schedule_today(message: Message):
     """
     Отображает расписание на сегодняшний день для пользователя,
-    исходя из его faculty_id и group_id в таблице user.
+    исходя из его группы (из кэша пользователей, при промахе — из БД).
     """
 
     await safe_delete_message(message)
@@ -111,47 +116,38 @@ async def get_schedule_today(message: Message):
     today = datetime.date.today()
     weekday = today.isoweekday()  # Понедельник=1, ..., Воскресенье=7
     current_week_mark =  week_mark.WEEK_MARK_TXT
+    group_name = None
 
     try:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(select(User).where(User.id == user_id))
-            user = result.scalar_one_or_none()
-            if not user:
-                await message.answer("❌ Вы ещё не зарегистрированы.")
-                return
-
-            group = user.group
-            if not group:
-                await message.answer("⚠️ Ваша группа не найдена.")
-                return
+        user = await get_user(user_id)
+        if user is None:
+            await message.answer("❌ Вы ещё не зарегистрированы.")
+            return
 
-            result = await session.execute(
-                select(Lesson)
-                .where(Lesson.group_id == group.id)
-                .where(Lesson.weekday == weekday)
-            )
-            lessons = result.scalars().all()
+        group_name = user.group_name
+        if not group_name:
+            await message.answer("⚠️ Ваша группа не найдена.")
+            return
 
-            lessons_today = [
-                l for l in lessons
-                if l.week_mark in ("every", current_week_mark)
-            ]
+        # Пары текущей недели уже отобраны и разложены по дням в кэше — берём только сегодняшний день
+        days = await get_schedule_days(group_name, current_week_mark)
+        today_days = tuple(day for day in days if day[0] == weekday)
 
-            if not lessons_today:
-                await message.answer("Сегодня пар нет 🎉")
-                return
+        if not today_days:
+            await message.answer("Сегодня пар нет 🎉")
+            return
 
-            text_blocks = format_schedule_students(
-                lessons=lessons_today,
-                week=current_week_mark,
-                header_prefix=f"📅 Расписание на сегодня ({today.strftime('%d.%m.%Y')})"
-            )
+        text_blocks = format_student_days(
+            today_days,
+            week=current_week_mark,
+            header_prefix=f"📅 Расписание на сегодня ({today.strftime('%d.%m.%Y')})"
+        )
 
-            for text in text_blocks:
-                await message.answer(text, parse_mode="MarkdownV2", disable_web_page_preview=True)
+        # Части (если расписание не уместилось в одно сообщение) отправляются по порядку
+        await answer_messages(message, text_blocks, parse_mode="MarkdownV2", disable_web_page_preview=True)
 
-    except Exception as e:
-        logger.error(f"⚠️ Ошибка при выводе расписания на сегодня для группы {group.group_name}: {e}")
+    except Exception:
+        logger.exception("⚠️ Ошибка при выводе расписания на сегодня для группы %s", group_name)
         await message.answer("⚠️ Ошибка при получении расписания.")
 
 
@@ -160,9 +156,9 @@ async def weekly_schedule(callback: CallbackQuery):
     """
     Обработчик кнопки "На текущую неделю".
 
-    1. Извлекает факультет и группу пользователя из БД.
+    1. Берёт группу пользователя из кэша пользователей (при промахе — из БД).
     2. Определяет текущий маркер недели (plus / minus).
-    3. Получает из таблицы Lesson все занятия для группы.
+    3. Получает занятия группы из кэша расписаний (при промахе — из БД).
     4. Форматирует и отправляет расписание на текущую неделю.
     """
 
@@ -175,44 +171,39 @@ async def weekly_schedule(callback: CallbackQuery):
 
     user_id = callback.from_user.id
     try:
-        async with AsyncSessionLocal() as session:
+        user = await get_user(user_id)
+        if user is None:
+            await callback.message.edit_text("❌ Вы ещё не зарегистрированы.")
+            await callback.answer()
+            return
 
-            result = await session.execute(
-                select(User).where(User.id == user_id)
-            )
-            user = result.scalar_one_or_none()
-            if not user:
-                await callback.message.edit_text("❌ Вы ещё не зарегистрированы.")
-                await callback.answer()
-                return
+        group_name = user.group_name
+        current_week = week_mark.WEEK_MARK_TXT
+        # Пары группы берутся из кэша расписаний (общего с просмотром «другого» расписания)
+        lessons = await get_schedule_for_group(group_name) if group_name else ()
 
-            current_week = week_mark.WEEK_MARK_TXT
-            lessons_query = await session.execute(
-                select(Lesson)
-                .where(Lesson.group_id == user.group_id)
-                .order_by(Lesson.weekday, Lesson.lesson_number)
-            )
-            lessons = lessons_query.scalars().all()
+        if not lessons:
+            await callback.message.edit_text("📭 Расписание для вашей группы отсутствует.")
+            await callback.answer()
+            return
 
-            if not lessons:
-                await callback.message.edit_text("📭 Расписание для вашей группы отсутствует.")
-                await callback.answer()
-                return
+        messages = format_student_days(
+            await get_schedule_days(group_name, current_week),
+            week=current_week,
+            header_prefix=f"📅 Расписание группы {group_name} на текущую неделю"
+        )
 
-            messages = format_schedule_students(
-                lessons,
-                week=current_week,
-                header_prefix=f"📅 Расписание группы {user.group.group_name} на текущую неделю"
+        # Первая часть заменяет сообщение с кнопками, остальные отправляются после неё по порядку дней
+        await callback.message.edit_text(messages[0], parse_mode="MarkdownV2", disable_web_page_preview=True)
+        if len(messages) > 1:
+            await answer_messages(
+                callback.message, messages[1:], parse_mode="MarkdownV2", disable_web_page_preview=True
             )
 
-            await callback.message.edit_text(messages[0], parse_mode="MarkdownV2", disable_web_page_preview=True)
-            for msg in messages[1:]:
-                await callback.message.answer(msg, parse_mode="MarkdownV2", disable_web_page_preview=True)
-
-            await callback.answer()
+        await callback.answer()
 
-    except Exception as e:
-        logger.error(f"⚠️ Ошибка при обработке weekly_schedule: {e}")
+    except Exception:
+        logger.exception("⚠️ Ошибка при обработке weekly_schedule")
         await callback.message.answer("⚠️ Произошла ошибка при получении расписания.")
         await callback.answer()
 
@@ -222,9 +213,9 @@ async def next_week_schedule(callback: CallbackQuery):
     """
     Обработчик кнопки "На следующую неделю".
 
-    1. Извлекает факультет и группу пользователя из БД.
+    1. Берёт группу пользователя из кэша пользователей (при промахе — из БД).
     2. Определяет маркер следующей недели (plus / minus).
-    3. Получает из таблицы Lesson все занятия для группы.
+    3. Получает занятия группы из кэша расписаний (при промахе — из БД).
     4. Форматирует и отправляет расписание на следующую неделю.
     """
 
@@ -237,49 +228,44 @@ async def next_week_schedule(callback: CallbackQuery):
 
     user_id = callback.from_user.id
     try:
-        async with AsyncSessionLocal() as session:
+        user = await get_user(user_id)
+        if user is None:
+            await callback.message.edit_text("❌ Вы ещё не зарегистрированы.")
+            await callback.answer()
+            return
 
-            result = await session.execute(
-                select(User).where(User.id == user_id)
-            )
-            user = result.scalar_one_or_none()
-            if not user:
-                await callback.message.edit_text("❌ Вы ещё не зарегистрированы.")
-                await callback.answer()
-                return
+        group_name = user.group_name
+        next_week = "plus" if week_mark.WEEK_MARK_TXT == "minus" else "minus"
+        # Пары группы берутся из кэша расписаний (общего с просмотром «другого» расписания)
+        lessons = await get_schedule_for_group(group_name) if group_name else ()
 
-            next_week = "plus" if week_mark.WEEK_MARK_TXT == "minus" else "minus"
-            lessons_query = await session.execute(
-                select(Lesson)
-                .where(Lesson.group_id == user.group_id)
-                .order_by(Lesson.weekday, Lesson.lesson_number)
-            )
-            lessons = lessons_query.scalars().all()
+        if not lessons:
+            await callback.message.answer("📭 Расписание для вашей группы отсутствует.")
+            return
 
-            if not lessons:
-                await callback.message.answer("📭 Расписание для вашей группы отсутствует.")
-                return
+        messages = format_student_days(
+            await get_schedule_days(group_name, next_week),
+            week=next_week,
+            header_prefix=f"📅 Расписание группы {group_name} на следующую неделю"
+        )
 
-            messages = format_schedule_students(
-                lessons,
-                week=next_week,
-                header_prefix=f"📅 Расписание группы {user.group.group_name} на следующую неделю"
+        # Первая часть заменяет сообщение с кнопками, остальные отправляются после неё по порядку дней
+        await callback.message.edit_text(messages[0], parse_mode="MarkdownV2", disable_web_page_preview=True)
+        if len(messages) > 1:
+            await answer_messages(
+                callback.message, messages[1:], parse_mode="MarkdownV2", disable_web_page_preview=True
             )
 
-            await callback.message.edit_text(messages[0], parse_mode="MarkdownV2", disable_web_page_preview=True)
-            for msg in messages[1:]:
-                await callback.message.answer(msg, parse_mode="MarkdownV2", disable_web_page_preview=True)
-
-            await callback.answer()
+        await callback.answer()
 
-    except Exception as e:
-        logger.error(f"⚠️ Ошибка при обработке next_week_schedule: {e}")
+    except Exception:
+        logger.exception("⚠️ Ошибка при обработке next_week_schedule")
         await callback.message.answer("⚠️ Произошла ошибка при получении расписания.")
         await callback.answer()
 
 
-@router.callback_query(StateFilter(ShowScheduleStates.choice_faculty), F.data.startswith("faculty:"))
-async def get_schedule_faculty(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(StateFilter(ShowScheduleStates.choice_faculty), FacultyCallback.filter())
+async def get_schedule_faculty(callback: CallbackQuery, callback_data: FacultyCallback, state: FSMContext):
     """
     Обработка выбора факультета.
 
@@ -297,18 +283,40 @@ async def get_schedule_faculty(callback: CallbackQuery, state: FSMContext):
         await state.clear()
         return
 
-    faculty_name = abbr_faculty[callback.data.split(":")[1]]
-    groups_kb = find_kb.groups_keyboards_find.get(faculty_name)
-    if not groups_kb:
+    entry = find_kb.faculty_kb_by_abbr.get(callback_data.abbr)
+    if entry is None:
         await callback.message.edit_text("⚠️ Для этого факультета нет групп.")
         return
+
+    faculty_name, groups_kb = entry
     await callback.message.edit_text(text=f"Выберите группу факультета {faculty_name}:", reply_markup=groups_kb)
     await callback.answer()
     await state.set_state(ShowScheduleStates.choice_group)
 
 
-@router.callback_query(StateFilter(ShowScheduleStates.choice_group), F.data.startswith("group:"))
-async def choice_type_week(callback: CallbackQuery, state: FSMContext):
+async def start_week_choice(state: FSMContext, group_name: str) -> str:
+    """
+    Общий шаг сценариев «своего» и «другого» расписания: выбор типа недели.
+
+    Сохраняет группу в состояние, переводит FSM в ShowScheduleStates.choice_week
+    и возвращает текст приглашения (отправка — на стороне вызывающего хендлера).
+
+    Параметры:
+        state (FSMContext): Контекст состояния FSM.
+        group_name (str): Название группы.
+
+    Возвращает:
+        str: Текст сообщения с выбором типа расписания.
+    """
+
+    await state.update_data(group_name=group_name)
+    await state.set_state(ShowScheduleStates.choice_week)
+
+    return f"Выберите тип расписания:\nСейчас неделя {week_mark.WEEK_MARK_STICKER}"
+
+
+@router.callback_query(StateFilter(ShowScheduleStates.choice_group), GroupCallback.filter())
+async def choice_type_week(callback: CallbackQuery, callback_data: GroupCallback, state: FSMContext):
     """
     Обработка выбора группы.
 
@@ -325,19 +333,15 @@ async def choice_type_week(callback: CallbackQuery, state: FSMContext):
         await state.clear()
         return
 
-    group_name = callback.data.split(":")[1]
-    await state.update_data(group_name=group_name)
-    await state.set_state(ShowScheduleStates.choice_week)
+    group_name = callback_data.name
+    text = await start_week_choice(state, group_name)
 
-    await callback.message.edit_text(
-        text=f"Выберите тип расписания:\nСейчас неделя {week_mark.WEEK_MARK_STICKER}",
-        reply_markup=get_choice_week_type_kb()
-    )
+    await callback.message.edit_text(text=text, reply_markup=get_choice_week_type_kb())
     await callback.answer()
 
 
-@router.callback_query(StateFilter(ShowScheduleStates.choice_week), F.data.startswith("week:"))
-async def show_schedule(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(StateFilter(ShowScheduleStates.choice_week), WeekCallback.filter())
+async def show_schedule(callback: CallbackQuery, callback_data: WeekCallback, state: FSMContext):
     """
     Показывает расписание для выбранной группы и типа недели
     (чётная, нечётная, полное) с использованием общей функции форматирования.
@@ -351,43 +355,65 @@ async def show_schedule(callback: CallbackQuery, state: FSMContext):
         await state.clear()
         return
 
+    choice_key = (callback.message.chat.id, callback.message.message_id)
+    if choice_key in _week_choice_sent:
+        await callback.answer()
+        return
+    _week_choice_sent.set(choice_key, True)
 
     state_data = await state.get_data()
     group_name = state_data.get("group_name")
-    week = callback.data.split(":")[1]
+    week = callback_data.week
 
     try:
-        lessons = await get_schedule_for_group(group_name)
-        if not lessons:
-            await callback.message.edit_text(f"Расписание для {group_name} пустое.")
-            return
+        # Готовые тексты берутся из кэша; при промахе расписание загружается и форматируется
+        epoch, messages = get_rendered_schedule(group_name, week)
+        if messages is None:
+            lessons = await get_schedule_for_group(group_name)
+            if not lessons:
+                await callback.message.edit_text(f"Расписание для {group_name} пустое.")
+                await callback.answer()
+                return
 
-        if week == "full":
-            header_prefix = f"📅 Полное расписание для {group_name}"
-        else:
-            header_prefix = f"📅 Расписание для {group_name} на неделю"
-        messages = format_schedule_students(
-            lessons=lessons,
-            week=week,
-            header_prefix=header_prefix
-        )
+            if week == "full":
+                header_prefix = f"📅 Полное расписание для {group_name}"
+            else:
+                header_prefix = f"📅 Расписание для {group_name} на неделю"
+            messages = tuple(format_student_days(
+                await get_schedule_days(group_name, week),
+                week=week,
+                header_prefix=header_prefix
+            ))
+            set_rendered_schedule(group_name, week, messages, epoch)
 
         if not messages:
             await callback.message.edit_text(
                 f"На выбранную неделю ({week_mark.WEEK_MARK_STICKER}) расписание для {group_name} пустое."
             )
+            await callback.answer()
             return
 
+        # Первая часть заменяет сообщение с выбором недели, остальные отправляются после неё по порядку дней
         await callback.message.edit_text(messages[0], parse_mode="MarkdownV2", disable_web_page_preview=True)
-        for msg in messages[1:]:
-            await callback.message.answer(msg.strip(), parse_mode="MarkdownV2", disable_web_page_preview=True)
+        if len(messages) > 1:
+            await answer_messages(
+                callback.message,
+                [msg.strip() for msg in messages[1:]],
+                parse_mode="MarkdownV2",
+                disable_web_page_preview=True
+            )
 
         await callback.answer()
 
-    except Exception as e:
-        logger.error(f"⚠️ Ошибка при выводе расписания для {group_name}: {e}")
-        await callback.message.edit_text(
-            text=f"⚠️ Произошла ошибка при выводе расписания для *{escape_md_v2(group_name)}*.",
-            parse_mode="MarkdownV2"
-        )
-        await callback.answer()
\ No newline at end of file
+    except Exception:
+        # Расписание не отправлено — повторное нажатие должно снова его показать
+        _week_choice_sent.pop(choice_key)
+        logger.exception("⚠️ Ошибка при выводе расписания для %s", group_name)
+        # Ответ на callback отправляется, даже если сообщение уже не удаётся изменить
+        await finalize_callback(
+            callback,
+            callback.message.edit_text(
+                text=f"⚠️ Произошла ошибка при выводе расписания для *{escape_md_v2(group_name or '')}*.",
+                parse_mode="MarkdownV2"
+            )
+        )
\ No newline at end of file
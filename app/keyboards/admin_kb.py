@@ -1,30 +1,33 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 
-def get_admin_kb():
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="Просмотреть логи", callback_data="get_logs")
-            ],
-            [
-                InlineKeyboardButton(text="Добавить администратора", callback_data="add_admin"),
-                InlineKeyboardButton(text="Список администраторов", callback_data="list_of_admins")
-            ],
-            [
-                InlineKeyboardButton(text="Синхронизировать расписание", callback_data="sync_schedule")
-            ],
-            [
-                InlineKeyboardButton(text="Очистить БД пользователей", callback_data="clear_user_db")
-            ],
-            [
-                InlineKeyboardButton(text="Очистить БД синхронизаций", callback_data="clear_sync_tables")
-            ],
-            [
-                InlineKeyboardButton(text="Выйти", callback_data="exit_admin_panel")
-            ],
+# Клавиатура не зависит от данных — создаётся один раз и общая для всех администраторов (изменять её нельзя)
+_ADMIN_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="Просмотреть логи", callback_data="get_logs")
+        ],
+        [
+            InlineKeyboardButton(text="Добавить администратора", callback_data="add_admin"),
+            InlineKeyboardButton(text="Список администраторов", callback_data="list_of_admins")
+        ],
+        [
+            InlineKeyboardButton(text="Синхронизировать расписание", callback_data="sync_schedule")
+        ],
+        [
+            InlineKeyboardButton(text="Очистить БД пользователей", callback_data="clear_user_db")
         ],
-        resize_keyboard=True
-    )
+        [
+            InlineKeyboardButton(text="Очистить БД синхронизаций", callback_data="clear_sync_tables")
+        ],
+        [
+            InlineKeyboardButton(text="Выйти", callback_data="exit_admin_panel")
+        ],
+    ],
+    resize_keyboard=True
+)
 
-    return keyboard
\ No newline at end of file
+
+def get_admin_kb():
+    """Возвращает клавиатуру административной панели."""
+    return _ADMIN_KB
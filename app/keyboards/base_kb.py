@@ -14,6 +14,9 @@
       кнопки отмены с разным callback_data.
 """
 
+from collections.abc import Mapping
+from types import MappingProxyType
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
@@ -21,6 +24,7 @@ from sqlalchemy.orm import selectinload
 import logging
 
 from app.database.db import AsyncSessionLocal
+from app.keyboards.callback_factories import FacultyCallback, GroupCallback
 from app.database.models import Faculty, Group
 from app.utils.schedule.fetcher import TimetableClient
 
@@ -85,7 +89,7 @@ async def refresh_base_keyboards():
     groups_keyboards_base = await create_courses_keyboards()
 
 
-def build_faculty_keyboards(faculty_groups: dict[str, list[str]]) -> dict[str, InlineKeyboardMarkup]:
+def build_faculty_keyboards(faculty_groups: dict[str, list[str]]) -> Mapping[str, InlineKeyboardMarkup]:
     """
     Формирует клавиатуры для факультетов по спискам групп.
 
@@ -93,7 +97,8 @@ def build_faculty_keyboards(faculty_groups: dict[str, list[str]]) -> dict[str, I
         faculty_groups: dict[str, list[str]] — {faculty_name: [group_name,...]}
 
     Возвращает:
-        dict[str, InlineKeyboardMarkup] — {faculty_name: InlineKeyboardMarkup}
+        Mapping[str, InlineKeyboardMarkup] — {faculty_name: InlineKeyboardMarkup}, доступный только для чтения
+            (клавиатуры общие для всех пользователей и не должны меняться хендлерами).
     """
 
     keyboards: dict[str, InlineKeyboardMarkup] = {}
@@ -102,13 +107,13 @@ def build_faculty_keyboards(faculty_groups: dict[str, list[str]]) -> dict[str, I
         group_names.sort()
         keyboard, row = [], []
         for i, group_name in enumerate(group_names):
-            row.append(InlineKeyboardButton(text=group_name, callback_data=f"group:{group_name}"))
+            row.append(InlineKeyboardButton(text=group_name, callback_data=GroupCallback(name=group_name).pack()))
             if len(row) == 3 or i == len(group_names) - 1:
                 keyboard.append(row)
                 row = []
         keyboards[faculty_name] = InlineKeyboardMarkup(inline_keyboard=keyboard)
 
-    return keyboards
+    return MappingProxyType(keyboards)
 
 
 # ================= ЗАГРУЗКА ДАННЫХ =================
@@ -149,12 +154,11 @@ async def create_faculty_keyboard():
     """
 
     async with AsyncSessionLocal() as session:
-        q = await session.execute(select(Faculty.name).order_by(Faculty.name))
-        faculties = q.scalars().all()
+        faculties = (await session.scalars(select(Faculty.name).order_by(Faculty.name))).all()
 
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text=f, callback_data=f"faculty:{faculty_abbr.get(f, f)}")]
+            [InlineKeyboardButton(text=f, callback_data=FacultyCallback(abbr=faculty_abbr.get(f, f)).pack())]
             for f in faculties
         ]
     )
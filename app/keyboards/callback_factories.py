@@ -0,0 +1,28 @@
+"""
+Фабрики callback data для кнопок выбора факультета, группы и типа недели.
+
+Один и тот же формат ("faculty:<ABBR>", "group:<название>") используется клавиатурами
+регистрации, поиска расписания и синхронизации; "week:<тип>" — клавиатурой выбора недели. Фабрики aiogram собирают строку
+при создании клавиатуры (pack) и разбирают её в фильтре хендлера (filter),
+передавая в хендлер готовый объект `callback_data`.
+"""
+
+from aiogram.filters.callback_data import CallbackData
+
+
+class FacultyCallback(CallbackData, prefix="faculty"):
+    """Выбор факультета: abbr — сокращение факультета (см. faculty_abbr)."""
+
+    abbr: str
+
+
+class GroupCallback(CallbackData, prefix="group"):
+    """Выбор группы: name — название группы."""
+
+    name: str
+
+
+class WeekCallback(CallbackData, prefix="week"):
+    """Выбор типа недели расписания группы: week — "plus", "minus" или "full"."""
+
+    week: str
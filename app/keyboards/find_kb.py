@@ -13,14 +13,18 @@
 Результат:
 - faculty_keyboard_find — клавиатура факультетов с кнопкой "◀️ Назад к расписаниям".
 - groups_keyboards_find — словарь клавиатур групп факультетов с кнопкой "◀️ Назад к расписаниям".
+- faculty_kb_by_abbr — те же клавиатуры по сокращению факультета из callback_data: {abbr: (название, клавиатура)}.
 """
 
+from types import MappingProxyType
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 import app.keyboards.base_kb as base_kb
 
 
 faculty_keyboard_find = None
 groups_keyboards_find = None
+faculty_kb_by_abbr = MappingProxyType({})
 
 
 async def refresh_find_keyboards():
@@ -32,10 +36,17 @@ async def refresh_find_keyboards():
     if base_kb.faculty_keyboard_base is None or base_kb.groups_keyboards_base is None:
         await base_kb.refresh_base_keyboards()
 
-    global faculty_keyboard_find, groups_keyboards_find
+    global faculty_keyboard_find, groups_keyboards_find, faculty_kb_by_abbr
     faculty_keyboard_find = await create_faculty_keyboard_find()
     groups_keyboards_find = await create_groups_keyboards_find()
 
+    # Выбор факультета в поиске — одна выборка по сокращению вместо abbr → название → клавиатура.
+    # Сокращение вычисляется так же, как при создании кнопок (base_kb.create_faculty_keyboard)
+    faculty_kb_by_abbr = MappingProxyType({
+        base_kb.faculty_abbr.get(name, name): (name, kb)
+        for name, kb in (groups_keyboards_find or {}).items()
+    })
+
 
 async def create_faculty_keyboard_find():
     """
@@ -71,8 +82,8 @@ async def create_groups_keyboards_find():
     в конец каждой клавиатуры добавляется кнопка: "◀️ Назад к расписаниям"
 
     Returns:
-        dict[str, InlineKeyboardMarkup] | None:
-            - словарь {faculty_name: клавиатура с группами и кнопкой отмены},
+        Mapping[str, InlineKeyboardMarkup] | None:
+            - словарь только для чтения {faculty_name: клавиатура с группами и кнопкой отмены},
             - None, если базовые клавиатуры отсутствуют.
     """
 
@@ -89,4 +100,5 @@ async def create_groups_keyboards_find():
         )
         faculty_kb[faculty] = new_kb
 
-    return faculty_kb
\ No newline at end of file
+    # Клавиатуры создаются один раз и общие для всех пользователей — словарь только для чтения
+    return MappingProxyType(faculty_kb)
\ No newline at end of file
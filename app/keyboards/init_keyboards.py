@@ -4,6 +4,7 @@ from app.keyboards.base_kb import refresh_base_keyboards
 from app.keyboards.find_kb import refresh_find_keyboards
 from app.keyboards.registration_kb import refresh_reg_keyboards
 # from app.keyboards.sync_kb import refresh_sync_keyboards
+from app.utils.cache.refdata import refresh_refdata
 
 logger = logging.getLogger(__name__)
 
@@ -14,4 +15,7 @@ async def refresh_all_keyboards():
     await refresh_find_keyboards()
     await refresh_reg_keyboards()
 
+    # Справочник ID факультетов и групп меняется вместе с клавиатурами
+    await refresh_refdata()
+
     logger.info('✅ Все клавиатуры обновлены')
\ No newline at end of file
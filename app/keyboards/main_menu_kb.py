@@ -1,36 +1,50 @@
 from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
-from app.database.db import AsyncSessionLocal
-from app.database.models import User
-from sqlalchemy import select
 
-async def get_main_menu_kb(user_id: int):
+from app.utils.cache.user_cache import UserInfo, get_user
+
+# Вариантов главного меню всего три, поэтому клавиатуры создаются один раз и общие для всех пользователей
+_GUEST_MENU_KB = ReplyKeyboardMarkup(
+    keyboard=[
+        [KeyboardButton(text="Регистрация")],
+        [KeyboardButton(text="Расписания")],
+    ],
+    resize_keyboard=True
+)
+
+_USER_MENU_BUTTONS = [
+    [KeyboardButton(text="Расписание на сегодня")],
+    [KeyboardButton(text="Другое расписание")],
+    [KeyboardButton(text="Прочие функции")]
+]
+
+_USER_MENU_KB = ReplyKeyboardMarkup(keyboard=_USER_MENU_BUTTONS, resize_keyboard=True)
+
+_ADMIN_MENU_KB = ReplyKeyboardMarkup(
+    keyboard=_USER_MENU_BUTTONS + [[KeyboardButton(text="Админ панель")]],
+    resize_keyboard=True
+)
+
+
+async def get_main_menu_kb(user_id: int, prefetched: UserInfo | None = None):
     """
-    Создает клавиатуру главного меню в зависимости от статуса регистрации и роли пользователя
+    Возвращает клавиатуру главного меню в зависимости от статуса регистрации и роли пользователя.
+
+    Статус и роль берутся из кэша пользователей (сбрасывается при регистрации,
+    выходе из профиля и смене роли), клавиатуры — готовые объекты модуля.
+
+    Параметры:
+        user_id (int): Telegram ID пользователя.
+        prefetched (UserInfo | None): Уже известные данные пользователя — если переданы,
+            кэш и БД не опрашиваются.
     """
 
-    async with AsyncSessionLocal() as session:
-        q = await session.execute(select(User).where(User.id == user_id))
-        user = q.scalars().first()
-
-    if user:
-        buttons = [
-            [KeyboardButton(text="Расписание на сегодня")],
-            [KeyboardButton(text="Другое расписание")],
-            [KeyboardButton(text="Прочие функции")]
-        ]
-
-        # если роль == 1 -> админ
-        if user.role == 1:
-            buttons.append([KeyboardButton(text="Админ панель")])
-
-        keyboard = ReplyKeyboardMarkup(keyboard=buttons, resize_keyboard=True)
-    else:
-        keyboard = ReplyKeyboardMarkup(
-            keyboard=[
-                [KeyboardButton(text="Регистрация")],
-                [KeyboardButton(text="Расписания")],
-            ],
-            resize_keyboard=True
-        )
-
-    return keyboard
\ No newline at end of file
+    user = prefetched if prefetched is not None else await get_user(user_id)
+
+    if user is None:
+        return _GUEST_MENU_KB
+
+    # если роль == 1 -> админ
+    if user.role == 1:
+        return _ADMIN_MENU_KB
+
+    return _USER_MENU_KB
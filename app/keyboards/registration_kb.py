@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 import app.keyboards.base_kb as base_kb
 
@@ -45,8 +47,8 @@ async def create_group_keyboards_reg():
     Создаёт словарь клавиатур групп для регистрации с кнопкой отмены.
 
     Returns:
-        dict[str, InlineKeyboardMarkup] | None:
-            - словарь {faculty_name: клавиатура с группами и кнопкой отмены},
+        Mapping[str, InlineKeyboardMarkup] | None:
+            - словарь только для чтения {faculty_name: клавиатура с группами и кнопкой отмены},
             - None, если базовые клавиатуры отсутствуют.
     """
     base = base_kb.groups_keyboards_base
@@ -62,4 +64,5 @@ async def create_group_keyboards_reg():
         )
         faculty_kb[faculty] = new_kb
 
-    return faculty_kb
\ No newline at end of file
+    # Клавиатуры создаются один раз и общие для всех пользователей — словарь только для чтения
+    return MappingProxyType(faculty_kb)
\ No newline at end of file
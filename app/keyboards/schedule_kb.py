@@ -1,38 +1,75 @@
+from functools import lru_cache
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from app.keyboards.callback_factories import WeekCallback
+
+
+# Клавиатуры без параметров создаются один раз и общие для всех пользователей (изменять их нельзя)
+_CHOICE_WEEK_TYPE_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="Неделя ➖", callback_data=WeekCallback(week="minus").pack())
+        ],
+        [
+            InlineKeyboardButton(text="Неделя ➕", callback_data=WeekCallback(week="plus").pack())
+        ],
+        [
+            InlineKeyboardButton(text="Полное расписание", callback_data=WeekCallback(week="full").pack())
+        ]
+    ]
+)
+
+_OTHER_SCHEDULES_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="На текущую неделю", callback_data="weekly_schedule"),
+            InlineKeyboardButton(text="На следующую неделю", callback_data="next_week_schedule")
+        ],
+        [
+            InlineKeyboardButton(text="Расписание преподавателя", callback_data="professor_schedule")
+        ],
+        [
+            InlineKeyboardButton(text="Расписание звонков", callback_data="bells_schedule")
+        ],
+        [
+            InlineKeyboardButton(text="Другое расписание", callback_data="other_schedule")
+        ],
+        [
+            InlineKeyboardButton(text="Выйти", callback_data="exit_other_schedules")
+        ]
+    ]
+)
+
 
 def get_choice_week_type_kb():
     """Возвращает клавиатуру выбора типа недели расписания студента."""
-    kb = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="Неделя ➖", callback_data=f"week:minus")
-            ],
-            [
-                InlineKeyboardButton(text="Неделя ➕", callback_data=f"week:plus")
-            ],
-            [
-                InlineKeyboardButton(text="Полное расписание", callback_data=f"week:full")
-            ]
-        ]
-    )
+    return _CHOICE_WEEK_TYPE_KB
 
-    return kb
 
+@lru_cache(maxsize=1024)
+def get_schedule_professors_kb(professor_id: int) -> InlineKeyboardMarkup:
+    """
+    Возвращает клавиатуру выбора типа расписания для преподавателя.
 
-def get_schedule_professors_kb(professor_name: str) -> InlineKeyboardMarkup:
-    """Возвращает клавиатуру выбора типа расписания для преподавателя."""
+    В callback_data передаётся ID преподавателя, а не имя: короткое число гарантированно
+    укладывается в лимит Telegram на callback_data (64 байта) и не требует повторного поиска по имени.
+
+    Клавиатура зависит только от ID, поэтому кэшируется: для популярных
+    преподавателей разметка не создаётся заново при каждом просмотре.
+    Возвращаемый объект общий — изменять его нельзя.
+    """
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="📅 Сегодня", callback_data=f"prof_today:{professor_name}")
+                InlineKeyboardButton(text="📅 Сегодня", callback_data=f"prof_today:{professor_id}")
             ],
             [
-                InlineKeyboardButton(text="➕ Неделя", callback_data=f"prof_week_plus:{professor_name}"),
-                InlineKeyboardButton(text="➖ Неделя", callback_data=f"prof_week_minus:{professor_name}")
+                InlineKeyboardButton(text="➕ Неделя", callback_data=f"prof_week_plus:{professor_id}"),
+                InlineKeyboardButton(text="➖ Неделя", callback_data=f"prof_week_minus:{professor_id}")
             ],
             [
-                InlineKeyboardButton(text="🗓 Вся неделя", callback_data=f"prof_week_full:{professor_name}")
+                InlineKeyboardButton(text="🗓 Вся неделя", callback_data=f"prof_week_full:{professor_id}")
             ],
             [
                 InlineKeyboardButton(text="◀️ Назад", callback_data="cancel")
@@ -43,25 +80,4 @@ def get_schedule_professors_kb(professor_name: str) -> InlineKeyboardMarkup:
 
 def get_other_schedules_kb():
     """Возвращает клавиатуру выбора типа расписания для студента."""
-    kb = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="На текущую неделю", callback_data="weekly_schedule"),
-                InlineKeyboardButton(text="На следующую неделю", callback_data="next_week_schedule")
-            ],
-            [
-                InlineKeyboardButton(text="Расписание преподавателя", callback_data="professor_schedule")
-            ],
-            [
-                InlineKeyboardButton(text="Расписание звонков", callback_data="bells_schedule")
-            ],
-            [
-                InlineKeyboardButton(text="Другое расписание", callback_data="other_schedule")
-            ],
-            [
-                InlineKeyboardButton(text="Выйти", callback_data="exit_other_schedules")
-            ]
-        ]
-    )
-
-    return kb
+    return _OTHER_SCHEDULES_KB
@@ -12,6 +12,7 @@ from app.utils.schedule.fetcher import TimetableClient
 import logging
 
 from app.keyboards.base_kb import faculty_abbr
+from app.keyboards.callback_factories import FacultyCallback, GroupCallback
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +52,7 @@ async def refresh_sync_keyboards():
     faculties = sorted({group['facultyName'] for group in data['groups']})
     faculty_keyboard_sync = InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text=f, callback_data=f"faculty:{faculty_abbr.get(f, f)}")]
+            [InlineKeyboardButton(text=f, callback_data=FacultyCallback(abbr=faculty_abbr.get(f, f)).pack())]
             for f in faculties
         ] + [[InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_faculty_sync")]]
     )
@@ -71,7 +72,7 @@ async def refresh_sync_keyboards():
         keyboard = []
         row = []
         for i, group_name in enumerate(groups):
-            row.append(InlineKeyboardButton(text=group_name, callback_data=f"group:{group_name}"))
+            row.append(InlineKeyboardButton(text=group_name, callback_data=GroupCallback(name=group_name).pack()))
             if len(row) == 3 or i == len(groups) - 1:
                 keyboard.append(row)
                 row = []
@@ -79,9 +80,21 @@ async def refresh_sync_keyboards():
         keyboard.append([InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_group_sync")])
         groups_keyboards_sync[faculty] = InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+
+# Клавиатура выбора типа синхронизации не зависит от данных — создаётся один раз (изменять её нельзя)
+_TYPE_SYNC_KB = InlineKeyboardMarkup(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="Синхронизация расписания для всех", callback_data="sync_university")],
+        [InlineKeyboardButton(text="Синхронизация расписания для факультета", callback_data="sync_faculty")],
+        [InlineKeyboardButton(text="Синхронизация расписания для группы", callback_data="sync_group")],
+        [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_choice_sync")]
+    ]
+)
+
+
 def get_type_sync_kb():
     """
-    Создаёт клавиатуру выбора типа синхронизации расписания.
+    Возвращает клавиатуру выбора типа синхронизации расписания.
 
     Кнопки:
         - Синхронизация расписания для всего университета.
@@ -90,11 +103,4 @@ def get_type_sync_kb():
         - Отмена
     """
 
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="Синхронизация расписания для всех", callback_data="sync_university")],
-            [InlineKeyboardButton(text="Синхронизация расписания для факультета", callback_data="sync_faculty")],
-            [InlineKeyboardButton(text="Синхронизация расписания для группы", callback_data="sync_group")],
-            [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel_choice_sync")]
-        ]
-    )
+    return _TYPE_SYNC_KB
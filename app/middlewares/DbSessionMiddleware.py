@@ -0,0 +1,29 @@
+from aiogram import BaseMiddleware
+from typing import Callable, Dict, Any, Awaitable
+
+from app.database.db import AsyncSessionLocal
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """
+    Открывает одну сессию БД на обработку апдейта и передаёт её в хендлер параметром `session`.
+
+    Регистрируется как inner-middleware только на роутерах, хендлеры которых принимают
+    `session` (registration, other_functions), поэтому сессия создаётся только для
+    апдейтов, прошедших фильтры этих хендлеров. Соединение из пула берётся при первом
+    запросе и возвращается при закрытии сессии после завершения хендлера.
+    Кэши (пользователи, справочник) при промахе открывают собственные сессии — через
+    `session` идут только запросы самого хендлера.
+    Фиксация изменений (commit) остаётся в хендлере, незафиксированные изменения
+    откатываются при закрытии сессии.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+        event: Any,
+        data: Dict[str, Any]
+    ) -> Any:
+        async with AsyncSessionLocal() as session:
+            data["session"] = session
+            return await handler(event, data)
@@ -118,21 +118,22 @@ async def refresh_admin_list():
 
     global LIST_ADMINS
     try:
+        # Нужны только ID — без загрузки ORM-объектов и joined-связей (группа, факультет).
+        # Сессия закрывается до запросов к Telegram, чтобы не держать соединение из пула.
         async with AsyncSessionLocal() as session:
-            q = await session.execute(select(User).where(User.role == 1))
-            users = q.scalars().all()
+            admin_ids = (await session.scalars(select(User.id).where(User.role == 1))).all()
 
-            LIST_ADMINS = {}
+        LIST_ADMINS = {}
 
-            if len(users) == 0:
-                logger.info("⚠️ В базе данных не были найдены админы")
-                return
+        if len(admin_ids) == 0:
+            logger.info("⚠️ В базе данных не были найдены админы")
+            return
 
-            for user in users:
-                username = await get_username_from_tg(user.id)
-                LIST_ADMINS[user.id] = username
+        for admin_id in admin_ids:
+            username = await get_username_from_tg(admin_id)
+            LIST_ADMINS[admin_id] = username
 
-            logger.info(f"✅ Список администраторов обновлен, админ(ов): {len(LIST_ADMINS)}")
+        logger.info(f"✅ Список администраторов обновлен, админ(ов): {len(LIST_ADMINS)}")
 
     except Exception as e:
         logger.error(f"❌ Ошибка при заполнении списка администраторов: {e}")
@@ -0,0 +1,87 @@
+"""
+Кэш справочных данных: соответствие названий факультетов и групп их ID.
+
+Факультеты и группы меняются только при синхронизации расписания,
+поэтому при регистрации пользователя их ID берутся из памяти, а не из БД.
+
+Логика обновления:
+- Данные загружаются лениво при первом обращении (под asyncio.Lock,
+  чтобы параллельные запросы не загружали их повторно).
+- После синхронизации кэш перезагружается вместе с клавиатурами (refresh_all_keyboards).
+- После очистки таблиц синхронизации кэш сбрасывается (clear_refdata).
+- После удаления группы без расписания (delete_group_if_exists, в том числе при синхронизации
+  одной группы, которая завершается без refresh_all_keyboards) кэш тоже сбрасывается.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.database.db import AsyncSessionLocal
+from app.database.models import Faculty, Group
+
+logger = logging.getLogger(__name__)
+
+_faculty_ids: dict[str, int] = {}  # {faculty_name: faculty_id}
+_group_ids: dict[str, int] = {}    # {group_name: group_id}
+_loaded = False
+_lock = asyncio.Lock()
+
+
+async def _load():
+    """Загружает ID факультетов и групп из БД (вызывается под _lock)."""
+
+    global _faculty_ids, _group_ids, _loaded
+
+    async with AsyncSessionLocal() as session:
+        faculties = (await session.execute(select(Faculty.name, Faculty.id))).all()
+        groups = (await session.execute(select(Group.group_name, Group.id))).all()
+
+    _faculty_ids = dict(faculties)
+    _group_ids = dict(groups)
+    _loaded = True
+
+    logger.debug(f"🔄 Справочник обновлён: {len(_faculty_ids)} факультетов, {len(_group_ids)} групп")
+
+
+async def refresh_refdata():
+    """Перезагружает ID факультетов и групп из БД."""
+
+    async with _lock:
+        await _load()
+
+
+async def _ensure_loaded():
+    """Загружает справочник при первом обращении (параллельные вызовы ждут одну загрузку)."""
+
+    if _loaded:
+        return
+
+    async with _lock:
+        if not _loaded:
+            await _load()
+
+
+async def get_faculty_id(faculty_name: str) -> int | None:
+    """Возвращает ID факультета по названию или None, если факультета нет."""
+
+    await _ensure_loaded()
+    return _faculty_ids.get(faculty_name)
+
+
+async def get_group_id(group_name: str) -> int | None:
+    """Возвращает ID группы по названию или None, если группы нет."""
+
+    await _ensure_loaded()
+    return _group_ids.get(group_name)
+
+
+def clear_refdata():
+    """Сбрасывает справочник — при следующем обращении он будет загружен заново."""
+
+    global _faculty_ids, _group_ids, _loaded
+
+    _faculty_ids = {}
+    _group_ids = {}
+    _loaded = False
@@ -0,0 +1,153 @@
+"""
+Кэш расписаний групп.
+
+Расписание группы меняется только при синхронизации, а просматривают его
+многие студенты одной группы подряд. Загруженные из БД пары хранятся
+в TTL-кэше по названию группы; кэш сбрасывается при любом изменении
+расписания (синхронизация, удаление группы, очистка таблиц).
+
+Вместе с парами в записи группы (GroupSchedule) хранятся заранее построенные
+представления для каждой недели ("plus", "minus", "full"): пары, отобранные
+по неделе и разложенные по дням. Они строятся один раз при загрузке группы,
+поэтому просмотр расписания не отбирает и не сортирует пары.
+
+Кроме того, кэшируются готовые тексты сообщений по ключу (группа, неделя):
+форматирование детерминировано, поэтому повторный просмотр той же недели
+обходится без форматирования и экранирования MarkdownV2. В ключ входит номер
+поколения (_epoch), который увеличивается при каждом сбросе, — устаревшие
+тексты перестают находиться и вытесняются по TTL.
+
+Поколение защищает и от гонки с синхронизацией: загрузка запоминает его
+(get_schedule_epoch) до обращения к БД и передаёт в set_cached_*; если за время
+загрузки кэш был сброшен, запись отбрасывается — данные, прочитанные до
+синхронизации, не попадают в новое поколение.
+
+Пары хранятся не ORM-объектами Lesson, а неизменяемыми LessonView: форматирование
+читает атрибуты из слотов, без дескрипторов и состояния сессии SQLAlchemy.
+Текст каждой пары форматируется для MarkdownV2 один раз при загрузке, а не при каждом просмотре.
+
+Расписания преподавателей кэшируются так же, по ID преподавателя: переходы
+«сегодня» → «➕ неделя» → «вся неделя» обходятся одним запросом к БД.
+
+В кэше хранятся кортежи — вызывающий код не должен изменять общие данные.
+"""
+
+from dataclasses import dataclass
+from typing import Mapping
+
+from app.utils.cache.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class LessonView:
+    """
+    Облегчённое представление пары группы для форматирования расписания.
+
+    Поля:
+        weekday (int | None): День недели (1–7).
+        lesson_number (int | None): Номер пары.
+        week_mark (str | None): Маркер недели (every/plus/minus).
+        slot_md (str): Заголовок блока пары (номер и время) в MarkdownV2.
+        text_md (str): Готовый текст пары в MarkdownV2 (маркер недели, предмет, преподаватели, место).
+    """
+
+    weekday: int | None
+    lesson_number: int | None
+    week_mark: str | None
+    slot_md: str
+    text_md: str
+
+
+@dataclass(frozen=True, slots=True)
+class GroupSchedule:
+    """
+    Запись кэша расписания группы.
+
+    Поля:
+        lessons (tuple[LessonView, ...]): Все пары группы.
+        days_by_week (Mapping[str, tuple]): {тип недели: результат split_lessons_by_day} для "plus", "minus", "full".
+    """
+
+    lessons: tuple
+    days_by_week: Mapping[str, tuple]
+
+
+_schedules = TTLCache(maxsize=512, ttl=120)  # {group_name: GroupSchedule}
+_professor_schedules = TTLCache(maxsize=512, ttl=120)  # {professor_id: (Professor, tuple[ProfessorLesson, ...])}
+_rendered = TTLCache(maxsize=2048, ttl=300)  # {(epoch, group_name, week): tuple[str, ...]}
+_epoch = 0
+
+
+def get_schedule_epoch() -> int:
+    """Возвращает текущее поколение кэша (увеличивается при каждом сбросе)."""
+
+    return _epoch
+
+
+def get_cached_schedule(group_name: str) -> GroupSchedule | None:
+    """Возвращает расписание группы из кэша или None при промахе."""
+
+    return _schedules.get(group_name)
+
+
+def set_cached_schedule(group_name: str, schedule: GroupSchedule, epoch: int):
+    """Сохраняет расписание группы в кэш, если с начала загрузки (поколение epoch) кэш не сбрасывался."""
+
+    if epoch == _epoch:
+        _schedules.set(group_name, schedule)
+
+
+def get_cached_professor_schedule(professor_id: int) -> tuple | None:
+    """Возвращает (преподаватель, пары) из кэша или None при промахе."""
+
+    return _professor_schedules.get(professor_id)
+
+
+def set_cached_professor_schedule(professor_id: int, schedule: tuple, epoch: int):
+    """Сохраняет (преподаватель, пары) в кэш, если с начала загрузки (поколение epoch) кэш не сбрасывался."""
+
+    if epoch == _epoch:
+        _professor_schedules.set(professor_id, schedule)
+
+
+def get_rendered_schedule(group_name: str, week: str) -> tuple[int, tuple | None]:
+    """
+    Возвращает (поколение, готовые тексты расписания группы на неделю или None при промахе).
+
+    Поколение нужно передать в set_rendered_schedule после форматирования при промахе.
+    """
+
+    epoch = _epoch
+    return epoch, _rendered.get((epoch, group_name, week))
+
+
+def set_rendered_schedule(group_name: str, week: str, messages: tuple, epoch: int):
+    """
+    Сохраняет готовые тексты расписания группы на неделю.
+
+    epoch — поколение, полученное из get_rendered_schedule до загрузки расписания: если с тех пор
+    кэш сбрасывался, тексты построены по устаревшим данным и не сохраняются.
+    """
+
+    if epoch == _epoch:
+        _rendered.set((epoch, group_name, week), messages)
+
+
+def invalidate_schedule(group_name: str):
+    """Сбрасывает кэш расписания одной группы (готовые тексты — через смену поколения)."""
+
+    global _epoch
+
+    _schedules.pop(group_name)
+    _epoch += 1
+
+
+def clear_schedule_cache():
+    """Полностью сбрасывает кэш расписаний (после синхронизации или очистки таблиц)."""
+
+    global _epoch
+
+    _schedules.clear()
+    _professor_schedules.clear()
+    _rendered.clear()
+    _epoch += 1
@@ -0,0 +1,47 @@
+"""
+Объединение одновременных загрузок одного и того же ключа (single-flight).
+
+При промахе кэша несколько пользователей одной группы часто нажимают кнопки
+почти одновременно: без объединения каждый из них выполнил бы один и тот же
+запрос к БД. SingleFlight запускает загрузку один раз, а остальные вызовы
+с тем же ключом ждут её результат.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Группа одновременных загрузок по ключам.
+
+    Особенности:
+    - Пока загрузка ключа выполняется, повторные вызовы do() с этим ключом получают её результат
+      (или её исключение) и не запускают новую.
+    - После завершения загрузки ключ освобождается — результат не хранится (для этого есть TTLCache).
+    - Загрузка выполняется отдельной задачей: отмена одного из ожидающих хендлеров не прерывает её
+      для остальных.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Возвращает результат загрузки ключа, запуская load() только если загрузка ещё не идёт.
+
+        Параметры:
+            key (Hashable): Ключ загрузки.
+            load (Callable[[], Awaitable]): Функция, создающая корутину загрузки.
+
+        Возвращает:
+            Any: Результат load().
+        """
+
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+        return await asyncio.shield(task)
@@ -0,0 +1,77 @@
+"""
+Простой in-memory кэш с ограничением времени жизни записей (TTL) и размера.
+
+Используется для снижения количества запросов к БД на «горячих» путях
+(данные пользователя, расписания), где допустима небольшая задержка
+актуальности. Все операции выполняются в одном потоке event loop,
+поэтому блокировки не требуются.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Кэш «ключ → значение» с истечением срока жизни и вытеснением LRU.
+
+    Особенности:
+    - Запись считается отсутствующей по истечении ttl секунд с момента записи.
+    - При превышении maxsize вытесняется давно не использовавшаяся запись.
+    - Время считается по time.monotonic() и не зависит от перевода системных часов.
+
+    Поля:
+    maxsize : int
+        Максимальное количество записей.
+    ttl : float
+        Время жизни записи (секунды).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Возвращает значение по ключу или default, если записи нет или она устарела."""
+
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Сохраняет значение и при необходимости вытесняет самую старую запись."""
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Удаляет запись (инвалидация) и возвращает её значение."""
+
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        """Полностью очищает кэш."""
+
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,97 @@
+"""
+Кэш данных пользователей бота.
+
+Почти каждое нажатие зарегистрированного пользователя требует его группу
+или роль. Вместо запроса к таблице users на каждое действие данные
+хранятся в TTL-кэше и сбрасываются при любом изменении пользователя
+(регистрация, смена группы, выход из профиля, смена роли, очистка таблицы),
+а также после синхронизации и очистки таблиц расписания, когда группы могут быть удалены.
+
+Отрицательный результат («пользователь не зарегистрирован») тоже кэшируется,
+но на более короткий срок: повторные нажатия незарегистрированного
+пользователя не занимают соединение из пула.
+"""
+
+from dataclasses import dataclass
+
+from sqlalchemy import bindparam, lambda_stmt, select
+
+from app.database.db import AsyncSessionLocal
+from app.database.models import User, Group
+from app.utils.cache.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class UserInfo:
+    """
+    Облегчённое представление пользователя для хендлеров.
+
+    Поля:
+        id (int): Telegram ID пользователя.
+        role (int): Роль (1 — администратор).
+        group_id (int | None): ID группы.
+        group_name (str | None): Название группы.
+    """
+
+    id: int
+    role: int
+    group_id: int | None
+    group_name: str | None
+
+
+_users = TTLCache(maxsize=10_000, ttl=60)
+_unregistered = TTLCache(maxsize=10_000, ttl=30)  # ID, для которых в БД нет записи
+
+# Запрос при промахе кэша: выражение строится и компилируется один раз, меняется только user_id
+_USER_INFO_STMT = lambda_stmt(
+    lambda: select(User.id, User.role, User.group_id, Group.group_name)
+    .outerjoin(Group, User.group_id == Group.id)
+    .where(User.id == bindparam("user_id"))
+)
+
+
+async def get_user(user_id: int) -> UserInfo | None:
+    """
+    Возвращает данные пользователя из кэша, при промахе — из БД.
+
+    Из БД выбираются только нужные колонки (users + название группы)
+    одним запросом, без загрузки связанных ORM-объектов.
+
+    Параметры:
+        user_id (int): Telegram ID пользователя.
+
+    Возвращает:
+        UserInfo | None: Данные пользователя или None, если он не зарегистрирован.
+    """
+
+    info = _users.get(user_id)
+    if info is not None:
+        return info
+
+    if user_id in _unregistered:
+        return None
+
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(_USER_INFO_STMT, {"user_id": user_id})).first()
+
+    if row is None:
+        _unregistered.set(user_id, True)
+        return None
+
+    info = UserInfo(id=row.id, role=row.role, group_id=row.group_id, group_name=row.group_name)
+    _users.set(user_id, info)
+    return info
+
+
+def invalidate_user(user_id: int):
+    """Сбрасывает кэш пользователя после изменения его данных в БД."""
+
+    _users.pop(user_id)
+    _unregistered.pop(user_id)
+
+
+def clear_users_cache():
+    """Полностью сбрасывает кэш (например, после массового удаления пользователей)."""
+
+    _users.clear()
+    _unregistered.clear()
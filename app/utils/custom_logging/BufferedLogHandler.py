@@ -44,6 +44,23 @@ class BufferedLogHandler(logging.Handler):
 
         return "\n".join(fmt.format(record) for record in self.buffer)
 
+    def get_logs_as_bytes(self, formatter: logging.Formatter | None = None) -> bytes:
+        """
+        Возвращает буфер логов в кодировке UTF-8 для отправки в Telegram.
+
+        Результат можно сразу передать в BufferedInputFile без промежуточного
+        BytesIO и лишних копий содержимого.
+
+        Аргументы:
+            formatter : logging.Formatter | None
+            Форматтер для логов.
+
+        Возвращает:
+            bytes : содержимое буфера
+        """
+
+        return self.get_logs_as_text(formatter).encode("utf-8")
+
     def get_logs_as_file(self, formatter: logging.Formatter | None = None) -> BytesIO:
         """
         Возвращает буфер логов как BytesIO-файл для отправки в Telegram.
@@ -56,9 +73,6 @@ class BufferedLogHandler(logging.Handler):
             BytesIO : файл с содержимым буфера
         """
 
-        file_bytes = BytesIO()
-        file_bytes.write(self.get_logs_as_text(formatter).encode("utf-8"))
-        file_bytes.seek(0)
-        return file_bytes
+        return BytesIO(self.get_logs_as_bytes(formatter))
 
 global_buffer_handler = BufferedLogHandler(capacity=500)
\ No newline at end of file
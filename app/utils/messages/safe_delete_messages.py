@@ -1,9 +1,11 @@
 """
 Предоставляет безопасные функции для удаления сообщений в Telegram с использованием Aiogram.
 Поддерживаются объекты Message, CallbackQuery, а также удаление по chat_id и message_id.
+Несколько сообщений можно удалить параллельно через safe_delete_many.
 Все ошибки TelegramBadRequest обрабатываются и логируются корректно.
 """
 
+import asyncio
 import logging
 from aiogram.types import Message, CallbackQuery
 from aiogram.exceptions import TelegramBadRequest
@@ -88,23 +90,21 @@ async def safe_delete_callback_message(callback: CallbackQuery) -> bool:
         logger.debug("safe_delete_message_by_id: некорректные параметры для удаления.")
         return False
 
-    try:
-        await callback.message.delete()
-        await callback.answer()
-        return True
+    # Ответ на callback и удаление сообщения независимы — выполняются параллельно
+    deleted, _ = await asyncio.gather(callback.message.delete(), callback.answer(), return_exceptions=True)
 
-    except TelegramBadRequest as e:
-        await callback.answer()
-        _handle_delete_error("callback", e, chat_id=callback.message.chat.id, message_id=callback.message.message_id)
+    if isinstance(deleted, TelegramBadRequest):
+        _handle_delete_error("callback", deleted, chat_id=callback.message.chat.id, message_id=callback.message.message_id)
         return False
 
-    except Exception as e:
-        await callback.answer()
+    if isinstance(deleted, Exception):
         logger.error(
-            f"❌ [callback] Неизвестная ошибка при удалении callback-сообщения {callback.message.message_id}: {e}"
+            f"❌ [callback] Неизвестная ошибка при удалении callback-сообщения {callback.message.message_id}: {deleted}"
         )
         return False
 
+    return True
+
 
 async def safe_delete_message_by_id(chat_id: int, message_id: int) -> bool:
     """
@@ -135,6 +135,53 @@ async def safe_delete_message_by_id(chat_id: int, message_id: int) -> bool:
         return False
 
 
+async def safe_delete_many(*targets: Message | tuple[int, int | None] | None) -> list[bool]:
+    """
+    Безопасно и параллельно удаляет несколько сообщений.
+
+    Все запросы к Telegram выполняются одновременно через asyncio.gather(return_exceptions=True),
+    ошибки разбираются одним проходом по результатам — без try/except на каждое сообщение.
+
+    Параметры:
+        *targets: Объекты Message или кортежи (chat_id, message_id).
+            None и кортежи с message_id=None пропускаются.
+
+    Возвращает:
+        list[bool]: Результат удаления для каждой непропущенной цели в исходном порядке.
+    """
+
+    targets = [
+        t for t in targets
+        if t is not None and not (isinstance(t, tuple) and t[1] is None)
+    ]
+
+    results = await asyncio.gather(
+        *(
+            bot.delete_message(chat_id=t[0], message_id=t[1]) if isinstance(t, tuple) else t.delete()
+            for t in targets
+        ),
+        return_exceptions=True
+    )
+
+    deleted = []
+    for target, result in zip(targets, results):
+        if isinstance(target, tuple):
+            chat_id, message_id = target
+        else:
+            chat_id, message_id = target.chat.id, target.message_id
+
+        if isinstance(result, TelegramBadRequest):
+            _handle_delete_error("many", result, chat_id=chat_id, message_id=message_id)
+            deleted.append(False)
+        elif isinstance(result, Exception):
+            logger.error(f"❌ [many] Ошибка при удалении сообщения {message_id}: {result}")
+            deleted.append(False)
+        else:
+            deleted.append(True)
+
+    return deleted
+
+
 async def safe_try_delete(target, *args, **kwargs) -> bool:
     """
     Универсальная безопасная функция удаления сообщения.
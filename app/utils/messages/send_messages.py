@@ -0,0 +1,81 @@
+"""
+Отправка многочастных сообщений (например, расписания, не уместившегося в одно сообщение)
+и завершение обработки callback-запросов.
+
+Части отправляются последовательно: Telegram не гарантирует порядок одновременно
+отправленных сообщений, а части расписания (дни недели) должны идти по порядку,
+и клавиатура должна оказаться под последней частью внизу чата. Количество
+одновременных запросов на отправку (от всех хендлеров) ограничено семафором,
+чтобы не упираться в лимиты Bot API.
+"""
+
+import asyncio
+import logging
+
+from typing import Awaitable
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, Message
+
+logger = logging.getLogger(__name__)
+
+SEND_CONCURRENCY = 20  # максимум одновременных запросов на отправку
+
+_send_semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+
+
+async def answer_messages(target: Message, texts: list[str], reply_markup=None, **kwargs) -> list[Message]:
+    """
+    По порядку отправляет несколько сообщений в чат target.
+
+    Каждая следующая часть отправляется после того, как Telegram принял предыдущую,
+    поэтому части появляются в чате в порядке texts, а клавиатура — под последней.
+
+    Параметры:
+        target (Message): Сообщение, в чат которого выполняется отправка (через target.answer).
+        texts (list[str]): Тексты сообщений.
+        reply_markup: Клавиатура, прикрепляемая только к последнему сообщению.
+        **kwargs: Дополнительные параметры answer (parse_mode, disable_web_page_preview и т.д.).
+
+    Возвращает:
+        list[Message]: Отправленные сообщения в порядке texts.
+    """
+
+    last = len(texts) - 1
+    sent = []
+
+    for i, text in enumerate(texts):
+        async with _send_semaphore:
+            sent.append(await target.answer(text, reply_markup=reply_markup if i == last else None, **kwargs))
+
+    return sent
+
+
+async def finalize_callback(callback: CallbackQuery, *requests: Awaitable, **answer_kwargs) -> list:
+    """
+    Отвечает на callback и параллельно выполняет связанные запросы к Telegram.
+
+    Вместо последовательных `await callback.message.edit_text(...)` и
+    `await callback.answer()` оба запроса уходят одновременно.
+
+    Параметры:
+        callback (CallbackQuery): Callback-запрос, на который нужно ответить.
+        *requests (Awaitable): Корутины запросов (edit_text, delete, answer и т.д.).
+        **answer_kwargs: Параметры callback.answer (text, show_alert).
+
+    Ошибки запросов не пробрасываются, но логируются (кроме «message is not modified» —
+    повторной правки сообщения тем же содержимым).
+
+    Возвращает:
+        list: Результаты запросов (исключения возвращаются, а не пробрасываются), без ответа на callback.
+    """
+
+    answered, *results = await asyncio.gather(callback.answer(**answer_kwargs), *requests, return_exceptions=True)
+
+    for result in (answered, *results):
+        if isinstance(result, TelegramBadRequest) and "message is not modified" in str(result):
+            continue
+        if isinstance(result, Exception):
+            logger.error("❌ Ошибка запроса к Telegram при обработке callback %s: %r", callback.data, result)
+
+    return results
@@ -0,0 +1,120 @@
+"""
+Очередь исходящих фоновых запросов к Telegram Bot API.
+
+Используется для «фоновых» отправок и редактирований, результат которых
+хендлеру не нужен (например, возврат сообщения в админ панель после
+уведомления об отмене). Такие запросы выполняются отдельным воркером
+с ограничением частоты, а хендлер сразу завершается и не держит
+пользователя в ожидании.
+
+Ответы на действия пользователя в очередь не попадают — хендлеры отправляют их
+сразу, поэтому очередь содержит только отложенные служебные запросы одного
+уровня важности и выполняет их в порядке поступления (FIFO).
+
+Функциональность:
+- asyncio.Queue: запросы выполняются в порядке постановки в очередь.
+- Ограничение частоты: между запросами выдерживается RATE_LIMIT (лимит Telegram ~30 запросов/сек).
+- Отложенная постановка в очередь (delay) без блокировки хендлера.
+- Ошибки Telegram API логируются и не останавливают воркер.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT = 1 / 30  # пауза между запросами (секунды)
+
+SendFactory = Callable[[], Awaitable]
+
+_queue: asyncio.Queue | None = None
+_worker_task: asyncio.Task | None = None
+_delayed_tasks: set[asyncio.Task] = set()  # сильные ссылки на отложенные задачи
+
+
+def start_send_worker():
+    """
+    Запускает фоновый воркер очереди, если он ещё не запущен.
+
+    Вызывается один раз при старте бота (on_startup).
+    """
+
+    global _queue, _worker_task
+
+    if _queue is None:
+        _queue = asyncio.Queue()
+
+    if _worker_task is None or _worker_task.done():
+        _worker_task = asyncio.create_task(_worker())
+
+
+async def _worker():
+    """
+    Последовательно выполняет запросы из очереди.
+
+    Логика работы:
+        1. Ждёт следующую задачу очереди.
+        2. Вызывает фабрику и ожидает корутину запроса к Telegram API.
+        3. Ошибки логируются на уровне DEBUG и не останавливают воркер.
+        4. Выдерживает RATE_LIMIT перед следующим запросом.
+    """
+
+    while True:
+        factory = await _queue.get()
+        try:
+            await _run(factory)
+        finally:
+            _queue.task_done()
+
+        await asyncio.sleep(RATE_LIMIT)
+
+
+async def _run(factory: SendFactory):
+    """Выполняет запрос, логируя ошибки Telegram API (сообщение могли удалить или уже изменить)."""
+
+    try:
+        await factory()
+    except Exception as e:
+        logger.debug("⚠️ Не удалось выполнить отложенный запрос к Telegram: %s", e)
+
+
+def _put(factory: SendFactory):
+    """Помещает фабрику запроса в очередь, либо выполняет её сразу, если воркер не запущен."""
+
+    if _queue is None:
+        # Воркер ещё не запущен (например, вызов до on_startup) — выполняем напрямую
+        task = asyncio.create_task(_run(factory))
+        _delayed_tasks.add(task)
+        task.add_done_callback(_delayed_tasks.discard)
+        return
+
+    _queue.put_nowait(factory)
+
+
+async def _put_after(factory: SendFactory, delay: float):
+    """Ставит запрос в очередь после паузы delay секунд."""
+
+    await asyncio.sleep(delay)
+    _put(factory)
+
+
+def enqueue(factory: SendFactory, delay: float = 0.0):
+    """
+    Ставит запрос к Telegram API в очередь на выполнение воркером.
+
+    Параметры:
+        factory (Callable[[], Awaitable]): Функция без аргументов, возвращающая корутину запроса,
+            например `lambda: message.edit_text("...")`. Корутина создаётся только в момент
+            выполнения, поэтому не «протухает» в очереди.
+        delay (float): Через сколько секунд поставить запрос в очередь.
+            Хендлер при этом не ждёт — пауза выполняется в отдельной задаче.
+    """
+
+    if delay <= 0:
+        _put(factory)
+        return
+
+    task = asyncio.create_task(_put_after(factory, delay))
+    _delayed_tasks.add(task)
+    task.add_done_callback(_delayed_tasks.discard)
@@ -1,17 +1,14 @@
 import re
-from collections import defaultdict
-
-MAX_MESSAGE_LENGTH = 4000
-
-weekday_names = {
-    1: "Понедельник",
-    2: "Вторник",
-    3: "Среда",
-    4: "Четверг",
-    5: "Пятница",
-    6: "Суббота",
-    7: "Воскресенье"
-}
+from itertools import groupby
+from operator import attrgetter
+
+# Лимит Telegram на длину сообщения — в UTF-16 code units (эмодзи вне BMP занимают две единицы)
+MAX_MESSAGE_LENGTH = 4096
+
+# Индекс = номер дня недели по isoweekday() (1 — понедельник)
+WEEKDAY_NAMES: tuple[str, ...] = (
+    "", "Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Воскресенье"
+)
 
 lessonTimeData = {
     0: {0: "08:30", 1: "10:05"},
@@ -26,103 +23,156 @@ lessonTimeData = {
 url_pattern = re.compile(r"(https?://\S+)")
 
 
+# Таблица экранирования MarkdownV2: каждый спецсимвол заменяется на "\\символ"
+_MD_V2_ESCAPE_TABLE = str.maketrans({c: f"\\{c}" for c in r"_*[]()~`>#+-=|{}.!\\"})
+
+
 def escape_md_v2(text: str):
     """
     Экранирует спецсимволы MarkdownV2.
 
+    Замена выполняется одним проходом str.translate (реализован на C)
+    по заранее построенной таблице.
+
     Параметры:
         text (str): Исходный текст.
     Возвращает:
         str: Текст с добавленными обратными слэшами перед спецсимволами.
     """
 
-    escape_chars = r"_*[]()~`>#+-=|{}.!\\"
-    return ''.join(f'\\{c}' if c in escape_chars else c for c in text)
+    return text.translate(_MD_V2_ESCAPE_TABLE)
 
 
-def _get_lesson_time(lesson_number):
-    """
-    Возвращает время начала и конца пары по её номеру.
+# Заголовки дней недели, маркеры, окончания заголовков и время пар не зависят от данных — вычисляются один раз.
+# Заголовки дней и время пар — кортежи с доступом по индексу (день недели / номер пары)
+_DAY_HEADERS: tuple[str, ...] = tuple(f"🗓 *{escape_md_v2(name)}*\n\n" for name in WEEKDAY_NAMES)
 
-    Параметры:
-        lesson_number (int): Номер пары (0–6).
-    Возвращает:
-        tuple[str, str]: (время_начала, время_конца)
-    """
+_WEEK_MARKERS = {"plus": "➕", "minus": "➖", "every": ""}
 
-    if lesson_number in lessonTimeData:
-        lesson = lessonTimeData[lesson_number]
-        return lesson[0], lesson[1]
-    else:
-        return "❓❓:❓❓", "❓❓:❓❓"
+_HEADER_SUFFIXES = {
+    "plus": " ➕\n\n\n",
+    "minus": " ➖\n\n\n",
+    "full": "\n\n\n"
+}
+_DEFAULT_HEADER_SUFFIX = "\n\n"
+
+# Маркеры пар, попадающих в расписание недели (пары без маркера идут каждую неделю); "full" и прочие — без фильтра
+_WEEK_ALLOWED_MARKS = {
+    "plus": frozenset(("plus", "every", None)),
+    "minus": frozenset(("minus", "every", None)),
+}
+
+_LESSON_TIMES: tuple[str, ...] = tuple(
+    f"{lessonTimeData[n][0]} \\- {lessonTimeData[n][1]}" for n in range(len(lessonTimeData))
+)
+_UNKNOWN_LESSON_TIME = "❓❓:❓❓ \\- ❓❓:❓❓"
 
 
-def _filter_lessons_by_week(lessons, week: str):
+def tg_len(text: str) -> int:
+    """Возвращает длину текста так, как её считает Telegram (в UTF-16 code units)."""
+
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _day_order_key(l):
+    """Ключ сортировки пар: день недели, затем номер пары (без номера — как первая)."""
+
+    return l.weekday, l.lesson_number or 0
+
+
+def split_lessons_by_day(lessons, week: str) -> tuple:
     """
-    Фильтрация пар по типу недели.
+    Отбирает пары выбранной недели и раскладывает их по дням.
+
+    Пары отбираются одним проходом (неделя и наличие дня), сортируются одним вызовом sort
+    по (день, номер пары) и группируются itertools.groupby.
+    Сортировка устойчивая: порядок пар с одинаковым номером сохраняется. Расписания групп
+    приходят из БД уже упорядоченными, поэтому Timsort обходит их за линейное время.
+
+    Результат не зависит от запроса пользователя, поэтому для расписаний групп
+    он кэшируется (см. get_schedule_days) и передаётся в format_student_days.
 
     Параметры:
-        lessons (list): Список объектов Lesson.
-        week (str): "plus" | "minus" | "full".
+        lessons (Iterable): Пары (Lesson, LessonView или ProfessorLesson).
+        week (str): Тип недели ("plus", "minus", "full").
     Возвращает:
-        list: Отфильтрованный список занятий.
+        tuple[tuple[int, tuple], ...]: Пары (день недели, пары дня) — дни по возрастанию,
+        пары внутри дня по номеру.
     """
 
-    if week == "plus":
-        return [l for l in lessons if l.week_mark in ("plus", "every", None)]
-    elif week == "minus":
-        return [l for l in lessons if l.week_mark in ("minus", "every", None)]
+    # Отбор по неделе и по наличию дня — одним проходом
+    allowed = _WEEK_ALLOWED_MARKS.get(week)
+    if allowed is None:
+        filtered = [l for l in lessons if l.weekday is not None]
     else:
-        return lessons[:]  # "full" — без фильтра
+        filtered = [l for l in lessons if l.weekday is not None and l.week_mark in allowed]
+    filtered.sort(key=_day_order_key)
+
+    return tuple((wd, tuple(day_lessons)) for wd, day_lessons in groupby(filtered, key=attrgetter("weekday")))
 
 
-def _create_lessons_by_day(filtered_lessons):
+def _iter_schedule_messages(days, format_day_func, header: str):
     """
-    Группировка пар по дням недели.
+    Формирует сообщения расписания по мере форматирования дней (генератор).
+
+    Дни форматируются по одному и сразу попадают в буфер текущего сообщения:
+    список текстов всех дней целиком не создаётся, в памяти одновременно
+    находятся только уже готовые сообщения и буфер текущего.
 
     Параметры:
-        filtered_lessons (list): Список отфильтрованных занятий.
+        days (Iterable): Пары, разложенные по дням (результат split_lessons_by_day).
+        format_day_func (Callable): Функция форматирования одного дня.
+        header (str): Заголовок расписания.
     Возвращает:
-        dict[int, list]: Ключ — номер дня недели, значение — список занятий.
+        Iterator[str]: Готовые сообщения по порядку.
     """
 
-    lessons_by_day = defaultdict(list)
-    for l in filtered_lessons:
-        if l.weekday is not None:
-            lessons_by_day[l.weekday].append(l)
-    return lessons_by_day
+    buf = [header]
+    size = tg_len(header)
+    for wd, day_lessons in days:
+        day_text = format_day_func(wd, day_lessons)
+        day_size = tg_len(day_text)  # длина в UTF-16 считается один раз на день
+
+        if size + day_size > MAX_MESSAGE_LENGTH:
+            yield "".join(buf)
+            buf = [day_text]
+            size = day_size
+        else:
+            buf.append(day_text)
+            size += day_size
+
+    if size:
+        yield "".join(buf)
 
 
-def _build_schedule_messages(lessons_by_day, format_day_func, header: str):
+def _build_schedule_messages(days, format_day_func, header: str):
     """
     Разбивает расписание на несколько сообщений (если текст слишком длинный).
 
     Параметры:
-        lessons_by_day (dict): Сгруппированные по дням занятия.
-        format_day_func (Callable): Функция форматирования одной пары.
+        days (tuple): Пары, разложенные по дням (результат split_lessons_by_day).
+        format_day_func (Callable): Функция форматирования одного дня.
         header (str): Заголовок расписания.
     Возвращает:
         list[str]: Список готовых сообщений.
     """
 
-    day_texts = []
-    for wd in sorted(lessons_by_day.keys()):
-        day_lessons = sorted(lessons_by_day[wd], key=lambda x: x.lesson_number or 0)
-        day_block = format_day_func(wd, day_lessons)
-        day_texts.append(day_block)
-
-    messages = []
-    current_text = header
-    for day_text in day_texts:
-        if len(current_text) + len(day_text) > MAX_MESSAGE_LENGTH:
-            messages.append(current_text)
-            current_text = day_text
-        else:
-            current_text += day_text
-    if current_text:
-        messages.append(current_text)
+    return list(_iter_schedule_messages(days, format_day_func, header))
+
+
+def _build_lesson_block(lesson_num: str, time_str: str, lesson_texts: list[str]) -> str:
+    """
+    Формирует блок одной пары: заголовок с номером и временем и занятия, идущие в это время.
+
+    Параметры:
+        lesson_num (str): Номер пары.
+        time_str (str): Время пары (уже экранированное).
+        lesson_texts (list[str]): Отформатированные занятия.
+    Возвращает:
+        str: Текст блока в MarkdownV2.
+    """
 
-    return messages
+    return f"*{lesson_num}\\. {time_str}*\n" + "\n\n".join(lesson_texts) + "\n"
 
 
 def _get_header(header_prefix: str, week: str):
@@ -136,12 +186,59 @@ def _get_header(header_prefix: str, week: str):
         str: Текст заголовка в MarkdownV2.
     """
 
-    header_prefix = f"*{escape_md_v2(header_prefix)}*"
-    return {
-        "plus": f"{header_prefix} ➕\n\n\n",
-        "minus": f"{header_prefix} ➖\n\n\n",
-        "full": f"{header_prefix}\n\n\n"
-    }.get(week, f"{header_prefix}\n\n")
+    return f"*{escape_md_v2(header_prefix)}*{_HEADER_SUFFIXES.get(week, _DEFAULT_HEADER_SUFFIX)}"
+
+
+def format_subject_md(subject: str | None) -> str:
+    """Возвращает название предмета, экранированное для MarkdownV2."""
+
+    return escape_md_v2(subject or "Предмет не указан")
+
+
+def format_professors_md(professors: str | list | None) -> str:
+    """Возвращает список преподавателей, экранированный для MarkdownV2."""
+
+    professors = ", ".join(professors) if isinstance(professors, list) else (
+            professors or "Преподаватель не указан")
+    return escape_md_v2(professors)
+
+
+def format_rooms_md(rooms: str | None) -> str:
+    """
+    Возвращает место проведения для MarkdownV2.
+
+    Ссылки на онлайн-занятия заменяются текстом "нажмите для подключения" со ссылкой,
+    остальной текст экранируется.
+    """
+
+    rooms_text = rooms or "Место проведения не указано"
+    urls = url_pattern.findall(rooms_text)
+    if urls:
+        return url_pattern.sub(lambda m: f"[нажмите для подключения]({m.group(0)})", rooms_text)
+    return escape_md_v2(rooms_text)
+
+
+def _format_lesson_slot(l):
+    """
+    Форматирует положение пары в расписании (маркер недели, номер, время).
+
+    Параметры:
+        l (Lesson | LessonView | ProfessorLesson): Объект занятия.
+    Возвращает:
+        tuple[str, str, str]: (week_marker, номер, время)
+    """
+
+    lesson_number = l.lesson_number
+    lesson_num = str((lesson_number or 0) + 1)
+
+    if lesson_number is not None and 0 <= lesson_number < len(_LESSON_TIMES):
+        time_str = _LESSON_TIMES[lesson_number]
+    else:
+        time_str = _UNKNOWN_LESSON_TIME
+
+    marker = _WEEK_MARKERS.get(l.week_mark or "every", "")
+
+    return marker, lesson_num, time_str
 
 
 def _format_common_lesson_data(l):
@@ -155,27 +252,49 @@ def _format_common_lesson_data(l):
             (week_marker, emoji_номер, предмет, аудитория, время)
     """
 
-    lesson_number = l.lesson_number
-    if lesson_number is None:
-        lesson_number = 0
-    lesson_num = str(lesson_number + 1) if lesson_number is not None else "❓"
+    marker, lesson_num, time_str = _format_lesson_slot(l)
 
-    start, end = _get_lesson_time(lesson_number=l.lesson_number)
-    time_str = f"{start} \\- {end}"
+    return marker, lesson_num, format_subject_md(l.subject), format_rooms_md(l.rooms), time_str
 
-    rooms_text = l.rooms or "Место проведения не указано"
-    urls = url_pattern.findall(rooms_text)
-    if urls:
-        rooms_text = url_pattern.sub(lambda m: f"[нажмите для подключения]({m.group(0)})", rooms_text)
-    else:
-        rooms_text = escape_md_v2(rooms_text)
-    room = f"{rooms_text}"
 
-    subject = escape_md_v2(l.subject or "Предмет не указан")
+def format_student_lesson_md(l) -> tuple[str, str]:
+    """
+    Форматирует пару группы для MarkdownV2 целиком.
+
+    Текст пары зависит только от самой пары (не от выбранной недели и не от пользователя),
+    поэтому вычисляется один раз при загрузке расписания в кэш (см. get_schedule_for_group).
 
-    marker = {"plus": "➕", "minus": "➖", "every": ""}.get(l.week_mark or "every", "")
+    Параметры:
+        l (Lesson): Объект занятия (нужны lesson_number, week_mark, subject, professors, rooms).
+    Возвращает:
+        tuple[str, str]: (заголовок блока пары с номером и временем, текст пары)
+    """
 
-    return marker, lesson_num, subject, room, time_str
+    marker, lesson_num, time_str = _format_lesson_slot(l)
+    slot_md = f"*{lesson_num}\\. {time_str}*\n"
+    text_md = f"{marker} *{format_subject_md(l.subject)}*\n       {format_professors_md(l.professors)}\n       {format_rooms_md(l.rooms)}"
+
+    return slot_md, text_md
+
+
+def _format_student_day(weekday, day_lessons):
+    """Форматирует один день расписания группы (пары — LessonView с готовыми текстами)"""
+
+    # Все части дня собираются в один список и склеиваются одним join, без промежуточных строк блоков.
+    # Подряд идущие пары с одинаковым номером и временем выводятся одним блоком
+    parts = [_DAY_HEADERS[weekday]]
+    for slot_md, slot_lessons in groupby(day_lessons, key=attrgetter("slot_md")):
+        if len(parts) > 1:
+            parts.append("\n")  # разделитель между блоками
+        parts.append(slot_md)
+        for i, lesson in enumerate(slot_lessons):
+            if i:
+                parts.append("\n\n")
+            parts.append(lesson.text_md)
+        parts.append("\n")
+    parts.append("\n\n")
+
+    return "".join(parts)
 
 
 def format_schedule_students(lessons, week: str, header_prefix: str = "📅 Расписание"):
@@ -183,75 +302,32 @@ def format_schedule_students(lessons, week: str, header_prefix: str = "📅 Ра
     Форматирование расписания для студентов.
 
     Параметры:
-        lessons (list): Список объектов Lesson.
+        lessons (list): Пары группы (LessonView, см. get_schedule_for_group).
         week (str): Тип недели ("plus", "minus", "full").
         header_prefix (str): Префикс заголовка расписания.
     Возвращает:
         list[str]: Список отформатированных текстов сообщений в MarkdownV2.
     """
 
-    filtered_lessons = _filter_lessons_by_week(lessons, week)
-    if not filtered_lessons:
-        return []
-
-    def format_day(weekday, day_lessons):
-        """Форматирует один день расписания"""
-        day_header = f"🗓 *{escape_md_v2(weekday_names[weekday])}*\n\n"
-
-        lesson_blocks = []
-        current_lesson_num = None
-        current_time_str = None
-        current_lessons = []
-
-        # Группируем пары по номеру и времени
-        for lesson in day_lessons:
-            marker, lesson_num, subject, room, time_str = _format_common_lesson_data(lesson)
-            professors = ", ".join(lesson.professors) if isinstance(lesson.professors, list) else (
-                    lesson.professors or "Преподаватель не указан")
-            professors = escape_md_v2(professors)
-
-            if lesson_num != current_lesson_num or time_str != current_time_str:
-                # Сохраняем предыдущую группу
-                if current_lessons:
-                    lesson_block = f"*{current_lesson_num}\\. {current_time_str}*\n"
-                    for i, lesson_data in enumerate(current_lessons):
-                        lesson_block += lesson_data
-                        if i < len(current_lessons) - 1:
-                            lesson_block += "\n\n"
-                        else:
-                            lesson_block += "\n"
+    return format_student_days(split_lessons_by_day(lessons, week), week, header_prefix)
 
-                    lesson_blocks.append(lesson_block)
 
-                # Начинаем новую группу
-                current_lesson_num = lesson_num
-                current_time_str = time_str
-                current_lessons = []
-
-            # Форматируем отдельную пару
-            lesson_text = f"{marker} *{subject}*\n"
-            lesson_text += f"       {professors}\n"
-            lesson_text += f"       {room}"
-            current_lessons.append(lesson_text)
-
-        # Добавляем последнюю группу
-        if current_lessons:
-            lesson_block = f"*{current_lesson_num}\\. {current_time_str}*\n"
-            for i, lesson_data in enumerate(current_lessons):
-                lesson_block += lesson_data
-                if i < len(current_lessons) - 1:
-                    lesson_block += "\n\n"
-                else:
-                    lesson_block += "\n"
-
-            lesson_blocks.append(lesson_block)
+def format_student_days(days, week: str, header_prefix: str = "📅 Расписание"):
+    """
+    Форматирование расписания для студентов по уже разложенным по дням парам.
 
-        return day_header + "\n".join(lesson_blocks) + "\n\n"
+    Параметры:
+        days (tuple): Результат split_lessons_by_day для той же недели.
+        week (str): Тип недели ("plus", "minus", "full").
+        header_prefix (str): Префикс заголовка расписания.
+    Возвращает:
+        list[str]: Список отформатированных текстов сообщений в MarkdownV2.
+    """
 
-    lessons_by_day = _create_lessons_by_day(filtered_lessons)
-    header = _get_header(header_prefix, week)
+    if not days:
+        return []
 
-    return _build_schedule_messages(lessons_by_day, format_day, header)
+    return _build_schedule_messages(days, _format_student_day, _get_header(header_prefix, week))
 
 
 def format_schedule_professor(lessons, week: str, header_prefix: str = "📅 Расписание преподавателя"):
@@ -266,13 +342,13 @@ def format_schedule_professor(lessons, week: str, header_prefix: str = "📅 Р
         list[str]: Список отформатированных сообщений в MarkdownV2.
     """
 
-    filtered_lessons = _filter_lessons_by_week(lessons, week)
-    if not filtered_lessons:
+    days = split_lessons_by_day(lessons, week)
+    if not days:
         return []
 
     def format_day(weekday, day_lessons):
         """Форматирует один день расписания преподавателя"""
-        day_header = f"🗓 *{escape_md_v2(weekday_names[weekday])}*\n\n"
+        day_header = _DAY_HEADERS[weekday]
 
         lesson_blocks = []
         current_lesson_num = None
@@ -291,15 +367,7 @@ def format_schedule_professor(lessons, week: str, header_prefix: str = "📅 Р
             if lesson_num != current_lesson_num or time_str != current_time_str:
                 # Сохраняем предыдущую группу
                 if current_lessons:
-                    lesson_block = f"*{current_lesson_num}\\. {current_time_str}*\n"
-                    for i, lesson_data in enumerate(current_lessons):
-                        lesson_block += lesson_data
-                        if i < len(current_lessons) - 1:
-                            lesson_block += "\n\n"
-                        else:
-                            lesson_block += "\n"
-
-                    lesson_blocks.append(lesson_block)
+                    lesson_blocks.append(_build_lesson_block(current_lesson_num, current_time_str, current_lessons))
 
                 # Начинаем новую группу
                 current_lesson_num = lesson_num
@@ -307,25 +375,12 @@ def format_schedule_professor(lessons, week: str, header_prefix: str = "📅 Р
                 current_lessons = []
 
             # Форматируем отдельную пару
-            lesson_text = f"{marker} *{subject}*\n"
-            lesson_text += f"       {room}"
-            current_lessons.append(lesson_text)
+            current_lessons.append(f"{marker} *{subject}*\n       {room}")
 
         # Добавляем последнюю группу
         if current_lessons:
-            lesson_block = f"*{current_lesson_num}\\. {current_time_str}*\n"
-            for i, lesson_data in enumerate(current_lessons):
-                lesson_block += lesson_data
-                if i < len(current_lessons) - 1:
-                    lesson_block += "\n\n"
-                else:
-                    lesson_block += "\n"
-
-            lesson_blocks.append(lesson_block)
+            lesson_blocks.append(_build_lesson_block(current_lesson_num, current_time_str, current_lessons))
 
         return day_header + "\n".join(lesson_blocks) + "\n\n"
 
-    lessons_by_day = _create_lessons_by_day(filtered_lessons)
-    header = _get_header(header_prefix, week)
-
-    return _build_schedule_messages(lessons_by_day, format_day, header)
\ No newline at end of file
+    return _build_schedule_messages(days, format_day, _get_header(header_prefix, week))
\ No newline at end of file
@@ -1,3 +1,18 @@
+"""
+Нечёткий поиск преподавателей по имени.
+
+Список преподавателей меняется только при полной синхронизации, поэтому он
+загружается из БД один раз и хранится в памяти вместе с триграммным индексом
+{триграмма: имена}. Запрос сравнивается RapidFuzz только с именами, у которых
+есть хотя бы одна общая с ним триграмма, а не со всеми преподавателями.
+
+Логика обновления:
+- Индекс строится лениво при первом поиске (под asyncio.Lock, чтобы параллельные
+  запросы не загружали его повторно).
+- После полной синхронизации и очистки таблиц индекс сбрасывается (clear_professor_index).
+"""
+
+import asyncio
 import logging
 
 from sqlalchemy import select
@@ -9,6 +24,11 @@ from app.database.models import Professor
 
 logger = logging.getLogger(__name__)
 
+_professors: dict[str, Professor] = {}       # {нормализованное имя: Professor}
+_trigrams: dict[str, frozenset[str]] = {}    # {триграмма: нормализованные имена}
+_loaded = False
+_lock = asyncio.Lock()
+
 
 def _normalize_name(name: str) -> str:
     """
@@ -37,11 +57,81 @@ def _normalize_name(name: str) -> str:
     return s.strip()
 
 
+def _name_trigrams(name: str) -> set[str]:
+    """Возвращает множество триграмм нормализованного имени (с пробелами по краям, чтобы учитывать начало и конец)."""
+
+    padded = f" {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+async def _load():
+    """Загружает преподавателей из БД и строит триграммный индекс (вызывается под _lock)."""
+
+    global _professors, _trigrams, _loaded
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Professor))
+        all_professors = result.scalars().all()
+
+    professors = {_normalize_name(professor.name): professor for professor in all_professors}
+
+    trigrams: dict[str, set[str]] = {}
+    for normalized in professors:
+        for trigram in _name_trigrams(normalized):
+            trigrams.setdefault(trigram, set()).add(normalized)
+
+    _professors = professors
+    _trigrams = {trigram: frozenset(names) for trigram, names in trigrams.items()}
+    _loaded = True
+
+    logger.debug(f"🔄 Индекс преподавателей обновлён: {len(_professors)} имён, {len(_trigrams)} триграмм")
+
+
+async def _ensure_loaded():
+    """Строит индекс при первом обращении (параллельные вызовы ждут одну загрузку)."""
+
+    if _loaded:
+        return
+
+    async with _lock:
+        if not _loaded:
+            await _load()
+
+
+def clear_professor_index():
+    """Сбрасывает индекс преподавателей — при следующем поиске он будет построен заново."""
+
+    global _professors, _trigrams, _loaded
+
+    _professors = {}
+    _trigrams = {}
+    _loaded = False
+
+
+def _candidate_names(query_normalized: str):
+    """
+    Отбирает имена-кандидаты для нечёткого сравнения по триграммному индексу.
+
+    Кандидаты — имена, у которых есть хотя бы одна общая с запросом триграмма.
+    Если таких нет, сравнение идёт со всеми именами, чтобы не потерять совпадения
+    по сильно искажённому запросу.
+    """
+
+    candidates = set()
+    for trigram in _name_trigrams(query_normalized):
+        names = _trigrams.get(trigram)
+        if names:
+            candidates.update(names)
+
+    return candidates or _professors.keys()
+
+
 async def search_professors_fuzzy(query: str, limit: int = 10, score_cutoff: float = 80.0) -> tuple[Professor | None, list[Professor]]:
     """
     Поиск преподавателей с использованием нечеткого сравнения RapidFuzz.
 
-    Каждый вызов функции напрямую обращается к базе данных, без использования кэша.
+    Преподаватели берутся из индекса в памяти (без запроса к БД), RapidFuzz
+    сравнивает запрос только с кандидатами, отобранными по триграммам.
 
     Параметры:
         query (str): Поисковый запрос пользователя
@@ -58,29 +148,22 @@ async def search_professors_fuzzy(query: str, limit: int = 10, score_cutoff: flo
         return None, []
 
     try:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(select(Professor))
-            all_professors = result.scalars().all()
-    except Exception as e:
-        logger.error("Ошибка при загрузке преподавателей: %s", e)
+        await _ensure_loaded()
+    except Exception:
+        logger.exception("❌ Ошибка при загрузке преподавателей")
         return None, []
 
-    if not all_professors:
+    if not _professors:
         return None, []
 
     query_normalized = _normalize_name(query)
-
-    professors_dict = {}
-
-    for professor in all_professors:
-        normalized = _normalize_name(professor.name)
-        professors_dict[normalized] = professor
+    professors_dict = _professors
 
     matches = process.extract(
-        query=query_normalized,            # что ищем
-        choices=professors_dict.keys(),    # где ищем
-        limit=limit,                       # максимальное количество результатов
-        score_cutoff=score_cutoff          # минимальный порог сходства
+        query=query_normalized,                       # что ищем
+        choices=_candidate_names(query_normalized),   # где ищем
+        limit=limit,                                  # максимальное количество результатов
+        score_cutoff=score_cutoff                     # минимальный порог сходства
     )
 
     exact_match = None
@@ -17,18 +17,31 @@
 """
 
 import logging
+from types import MappingProxyType
 from typing import List, Set
 
 from app.keyboards.init_keyboards import refresh_all_keyboards
+from app.utils.cache.schedule_cache import (
+    GroupSchedule, LessonView, clear_schedule_cache, get_cached_professor_schedule, get_cached_schedule,
+    get_schedule_epoch, invalidate_schedule, set_cached_professor_schedule, set_cached_schedule
+)
+from app.utils.cache.refdata import clear_refdata
+from app.utils.cache.single_flight import SingleFlight
+from app.utils.cache.user_cache import clear_users_cache
 from app.utils.schedule.fetcher import TimetableClient
 from app.utils.schedule.parser import extract_lessons_from_timetable_json, extract_professor_names
+from app.utils.schedule.schedule_formatter import format_student_lesson_md, split_lessons_by_day
+from app.utils.schedule.search_professors import clear_professor_index
 from app.database.db import AsyncSessionLocal
 from app.database.models import Faculty, Group, Lesson, Professor, ProfessorLesson
-from sqlalchemy import select, delete, case
+from sqlalchemy import select, delete, insert, case, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
+_schedule_loads = SingleFlight()  # загрузки расписаний групп, выполняющиеся в данный момент
+_professor_loads = SingleFlight()  # загрузки расписаний преподавателей, выполняющиеся в данный момент
+
 
 async def ensure_faculty_and_group(session: AsyncSession, faculty_name: str, group_name: str):
     """
@@ -50,15 +63,13 @@ async def ensure_faculty_and_group(session: AsyncSession, faculty_name: str, gro
 
     faculty = None
     if faculty_name:
-        q = await session.execute(select(Faculty).where(Faculty.name == faculty_name))
-        faculty = q.scalars().first()
+        faculty = await session.scalar(select(Faculty).where(Faculty.name == faculty_name))
         if not faculty:
             faculty = Faculty(name=faculty_name)
             session.add(faculty)
             await session.flush()
 
-    q = await session.execute(select(Group).where(Group.group_name == group_name))
-    group = q.scalars().first()
+    group = await session.scalar(select(Group).where(Group.group_name == group_name))
     if not group:
         group = Group(group_name=group_name, faculty_id=faculty.id if faculty else None)
         session.add(group)
@@ -81,8 +92,7 @@ async def delete_group_if_exists(session, group_name: str):
     4. Фиксирует изменения через commit().
     """
 
-    q = await session.execute(select(Group).where(Group.group_name == group_name))
-    group = q.scalars().first()
+    group = await session.scalar(select(Group).where(Group.group_name == group_name))
     if not group:
         return False
 
@@ -90,6 +100,9 @@ async def delete_group_if_exists(session, group_name: str):
     await session.execute(delete(Lesson).where(Lesson.group_id == group.id))
     await session.delete(group)
     await session.commit()
+    invalidate_schedule(group_name)
+    clear_refdata()  # иначе get_group_id() вернёт ID удалённой группы до следующей синхронизации
+    clear_users_cache()  # у пользователей удалённой группы group_id сброшен в NULL
     return True
 
 
@@ -99,7 +112,7 @@ async def upsert_lessons_for_group(session: AsyncSession, group_obj: Group, reco
 
     Логика:
     - Для упрощения сначала удаляются старое расписание для этой группы.
-    - Вставляются новые записи из списка records.
+    - Вставляются новые записи из списка records (одним пакетным INSERT).
     - week_mark конвертируется в допустимое перечисление (None, 'every', 'plus', 'minus').
 
     Параметры:
@@ -123,22 +136,24 @@ async def upsert_lessons_for_group(session: AsyncSession, group_obj: Group, reco
         )
         await session.flush()
 
-        count = 0
-        for rec in records:
-            lesson = Lesson(
-                group_id=group_obj.id,
-                weekday=rec.get("weekday"),
-                lesson_number=rec.get("lesson_number"),
-                subject=rec.get("subject"),
-                professors=rec.get("professors"),
-                rooms=rec.get("rooms"),
-                week_mark=rec.get("week_mark"),
-                type=rec.get("type"),
-            )
-            session.add(lesson)
-            count += 1
-
-        return count
+        # Все пары группы вставляются одним INSERT с пакетом параметров (executemany),
+        # без создания ORM-объектов и отслеживания их в сессии
+        rows = [
+            {
+                "group_id": group_obj.id,
+                "weekday": rec.get("weekday"),
+                "lesson_number": rec.get("lesson_number"),
+                "subject": rec.get("subject"),
+                "professors": rec.get("professors"),
+                "rooms": rec.get("rooms"),
+                "week_mark": rec.get("week_mark"),
+                "type": rec.get("type"),
+            }
+            for rec in records
+        ]
+        await session.execute(insert(Lesson), rows)
+
+        return len(rows)
 
     except Exception as e:
         logger.error(f"Ошибка при обновлении пар для группы group_id = {group_obj.id}: {e}")
@@ -163,8 +178,7 @@ async def upsert_lessons_for_professors(session: AsyncSession):
 
         await session.execute(delete(ProfessorLesson))
 
-        result = await session.execute(select(Lesson))
-        lessons = result.scalars().all()
+        lessons = (await session.scalars(select(Lesson))).all()
 
         professors_cache: dict[str, int] = {}  # имя -> id
         added_records: set[tuple[int, int, int, str, str, str]] = set()  # защита от дублей
@@ -182,8 +196,7 @@ async def upsert_lessons_for_professors(session: AsyncSession):
             for prof_name in professor_names:
                 prof_id = professors_cache.get(prof_name)
                 if not prof_id:
-                    res = await session.execute(select(Professor).where(Professor.name == prof_name))
-                    professor = res.scalar_one_or_none()
+                    professor = await session.scalar(select(Professor).where(Professor.name == prof_name))
                     if not professor:
                         professor = Professor(name=prof_name)
                         session.add(professor)
@@ -339,6 +352,9 @@ async def run_full_sync(limit_groups: int = None, type_idx: int = 0):
     logger.info("Групп с расписанием: %d, удалено: %d", len(valid_groups), deleted_groups)
     logger.info("Преподавателей: %d, удалено: %d", len(existing_profs) - deleted_profs, deleted_profs)
 
+    clear_schedule_cache()
+    clear_users_cache()
+    clear_professor_index()
     await refresh_all_keyboards()
 
 
@@ -412,8 +428,7 @@ async def run_full_sync_for_faculty(faculty_name: str, limit_groups: int = None,
                              group_name, faculty_name, e)
                 await session.rollback()
 
-            qf = await session.execute(select(Faculty).where(Faculty.name == faculty_name))
-            faculty_obj = qf.scalars().first()
+            faculty_obj = await session.scalar(select(Faculty).where(Faculty.name == faculty_name))
 
         q = await session.execute(select(Group).where(Group.faculty_id == faculty_obj.id))
         existing = q.scalars().all()
@@ -429,6 +444,8 @@ async def run_full_sync_for_faculty(faculty_name: str, limit_groups: int = None,
         total = len(valid_groups)
         logger.info("✅ Синхронизация для %s завершена. Групп обработано: %d",faculty_name, total)
 
+        clear_schedule_cache()
+        clear_users_cache()
         await refresh_all_keyboards()
 
         return total
@@ -491,6 +508,7 @@ async def run_full_sync_for_group(group_name: str, type_idx: int = 0):
             inserted = await upsert_lessons_for_group(session, group_obj, records)
             await session.commit()
 
+            clear_schedule_cache()
             await refresh_all_keyboards()
             return inserted
 
@@ -498,36 +516,41 @@ async def run_full_sync_for_group(group_name: str, type_idx: int = 0):
             await client.close()
 
 
-async def get_schedule_for_group(group_name: str):
+# Типы недели, для которых представления строятся при загрузке группы
+_SCHEDULE_WEEKS = ("plus", "minus", "full")
+
+_EMPTY_SCHEDULE = GroupSchedule(lessons=(), days_by_week=MappingProxyType({}))
+
+
+async def _get_group_schedule(group_name: str) -> GroupSchedule:
     """
-    Получение расписания группы из базы данных.
+    Получение записи расписания группы (из кэша или из базы данных).
 
-    Параметры:
-    ----------
-    group_name : str
-        Название группы, для которой нужно получить расписание.
+    Одновременные промахи по одной группе объединяются: загрузка из БД выполняется один раз,
+    остальные вызовы ждут её результат (app/utils/cache/single_flight.py). В ключ загрузки входит
+    поколение кэша: вызовы после сброса (синхронизации) не получают загрузку, начатую до него.
+    """
 
-    Возвращает:
-    ----------
-    List[Lesson]
-        Список объектов Lesson, принадлежащих указанной группе.
-        Если группа не найдена — возвращает пустой список.
+    cached = get_cached_schedule(group_name)
+    if cached is not None:
+        return cached
 
-    Логика работы функции:
-    --------------------
-    1. Создаем асинхронную сессию с базой данных.
-    2. Выполняем запрос к таблице `Group`, фильтруя по `group_name`.
-    3. Если группа не найдена, возвращаем пустой список.
-    4. Если группа найдена:
-        a. Выполняем запрос к таблице `Lesson`, выбирая пары с `group_id` соответствующей группы.
-        b. Возвращаем все найденные пары.
+    epoch = get_schedule_epoch()
+    return await _schedule_loads.do((epoch, group_name), lambda: _load_group_schedule(group_name, epoch))
+
+
+async def _load_group_schedule(group_name: str, epoch: int) -> GroupSchedule:
+    """
+    Загружает расписание группы из БД, строит представления по неделям и сохраняет запись в кэш.
+
+    Если группа не найдена, возвращается пустая запись (не кэшируется). Если за время загрузки
+    кэш был сброшен (поколение отличается от epoch), запись в кэш не сохраняется.
     """
 
     async with AsyncSessionLocal() as session:
-        q = await session.execute(select(Group).where(Group.group_name == group_name))
-        group = q.scalars().first()
+        group = await session.scalar(select(Group).where(Group.group_name == group_name))
         if not group:
-            return []
+            return _EMPTY_SCHEDULE
 
         week_mark_order = case(
             (Lesson.week_mark == 'every', 1),
@@ -536,34 +559,158 @@ async def get_schedule_for_group(group_name: str):
             else_=4
         )
 
+        # Выбираются только колонки, нужные для вывода, — без материализации ORM-объектов
         q = await session.execute(
-            select(Lesson)
+            select(
+                Lesson.weekday, Lesson.lesson_number, Lesson.subject,
+                Lesson.professors, Lesson.rooms, Lesson.week_mark
+            )
             .where(Lesson.group_id == group.id)
-            .order_by(week_mark_order)
+            .order_by(Lesson.weekday, func.coalesce(Lesson.lesson_number, 0), week_mark_order)
+        )
+        lessons = tuple(
+            LessonView(row.weekday, row.lesson_number, row.week_mark, *format_student_lesson_md(row))
+            for row in q.all()
         )
-        lessons = q.scalars().all()
 
-        return lessons
+    schedule = GroupSchedule(
+        lessons=lessons,
+        days_by_week=MappingProxyType({week: split_lessons_by_day(lessons, week) for week in _SCHEDULE_WEEKS})
+    )
+    set_cached_schedule(group_name, schedule, epoch)
+    return schedule
 
 
-async def get_lesson_for_professor(professor_name: str):
-    """Получить все пары преподавателя по имени"""
-    async with AsyncSessionLocal() as session:
-        query = await session.execute(
-            select(Professor).where(Professor.name.ilike(f"%{professor_name}%"))
-        )
-        professors = query.scalars().all()
+async def get_schedule_for_group(group_name: str) -> tuple[LessonView, ...]:
+    """
+    Получение расписания группы (из кэша или из базы данных).
+
+    Параметры:
+    ----------
+    group_name : str
+        Название группы, для которой нужно получить расписание.
 
-        if not professors or len(professors) > 1:
-            return None, professors
+    Возвращает:
+    ----------
+    tuple[LessonView, ...]
+        Кортеж пар (LessonView), принадлежащих указанной группе.
+        Если группа не найдена — возвращает пустой кортеж.
+        Результат общий для всех вызывающих (кэш) — изменять его нельзя.
+
+    Логика работы функции:
+    --------------------
+    1. Если расписание группы есть в кэше (app/utils/cache/schedule_cache.py) — возвращаем его.
+       Одновременные промахи по одной группе объединяются в одну загрузку.
+    2. Иначе выполняем запрос к таблице `Group`, фильтруя по `group_name`.
+    3. Если группа не найдена, возвращаем пустой кортеж (не кэшируется).
+    4. Если группа найдена:
+        a. Выполняем запрос к таблице `Lesson`, выбирая нужные колонки пар с `group_id` группы,
+           упорядоченные по дню, номеру пары и маркеру недели (в этом порядке их выводит форматтер),
+           и преобразуем строки в LessonView (текст пары форматируется здесь, один раз).
+        b. Строим представления по неделям (plus / minus / full) — пары, разложенные по дням.
+        c. Сохраняем запись в кэш и возвращаем пары.
+    """
 
-        professor = professors[0]
+    return (await _get_group_schedule(group_name)).lessons
 
-        query = await session.execute(
-            select(ProfessorLesson)
-            .where(ProfessorLesson.professor_id == professor.id)
-            .order_by(ProfessorLesson.weekday, ProfessorLesson.lesson_number)
-        )
+
+async def get_schedule_days(group_name: str, week: str) -> tuple:
+    """
+    Получение пар группы на выбранную неделю, разложенных по дням.
+
+    Параметры:
+    ----------
+    group_name : str
+        Название группы.
+    week : str
+        Тип недели ("plus", "minus", "full").
+
+    Возвращает:
+    ----------
+    tuple[tuple[int, tuple[LessonView, ...]], ...]
+        Результат split_lessons_by_day для пар группы (пустой кортеж, если пар нет).
+        Представления недель строятся при загрузке группы, здесь — только выборка из словаря.
+        Результат общий для всех вызывающих (кэш) — изменять его нельзя.
+    """
+
+    schedule = await _get_group_schedule(group_name)
+
+    days = schedule.days_by_week.get(week)
+    if days is None:
+        # Нестандартный тип недели (например, маркер ещё не определён) — отбираем на месте
+        days = split_lessons_by_day(schedule.lessons, week)
+
+    return days
+
+
+async def get_lesson_for_professor(professor_id: int):
+    """
+    Получить преподавателя и все его пары по ID из БД (без кэша — см. get_professor_schedule).
+
+    Преподаватель загружается вместе с парами одним запросом (связь ProfessorLesson.professor
+    присоединяется через JOIN). Отдельный запрос к professors выполняется только если
+    пар нет.
+
+    Параметры:
+        professor_id (int): ID преподавателя.
+
+    Возвращает:
+        tuple[Professor | None, list[ProfessorLesson]]: Преподаватель (None, если не найден) и его пары,
+        отсортированные по дню недели и номеру пары.
+    """
+    stmt = (
+        select(ProfessorLesson)
+        .where(ProfessorLesson.professor_id == professor_id)
+        .order_by(ProfessorLesson.weekday, ProfessorLesson.lesson_number)
+    )
+
+    async with AsyncSessionLocal() as session:
+        query = await session.execute(stmt)
         lessons = query.scalars().all()
 
-        return professor, lessons
\ No newline at end of file
+        if lessons:
+            return lessons[0].professor, lessons
+
+        professor = await session.get(Professor, professor_id)
+        return professor, []
+
+
+async def get_professor_schedule(professor_id: int) -> tuple:
+    """
+    Получить преподавателя и все его пары (из кэша или из базы данных).
+
+    Расписание преподавателя на сегодня и на любую неделю отбирается из одной записи кэша,
+    поэтому переходы между ними не обращаются к БД. Одновременные промахи по одному
+    преподавателю объединяются в одну загрузку.
+
+    Параметры:
+        professor_id (int): ID преподавателя.
+
+    Возвращает:
+        tuple[Professor | None, tuple[ProfessorLesson, ...]]: Преподаватель (None, если не найден — не кэшируется)
+        и его пары, отсортированные по дню недели и номеру пары.
+        Результат общий для всех вызывающих (кэш) — изменять его нельзя.
+    """
+
+    cached = get_cached_professor_schedule(professor_id)
+    if cached is not None:
+        return cached
+
+    # Поколение кэша в ключе загрузки: вызовы после сброса не получают загрузку, начатую до него
+    epoch = get_schedule_epoch()
+    return await _professor_loads.do((epoch, professor_id), lambda: _load_professor_schedule(professor_id, epoch))
+
+
+async def _load_professor_schedule(professor_id: int, epoch: int) -> tuple:
+    """
+    Загружает преподавателя и его пары из БД и сохраняет запись в кэш (если преподаватель найден
+    и за время загрузки кэш не сбрасывался — поколение совпадает с epoch).
+    """
+
+    professor, lessons = await get_lesson_for_professor(professor_id)
+    if professor is None:
+        return None, ()
+
+    schedule = (professor, tuple(lessons))
+    set_cached_professor_schedule(professor_id, schedule, epoch)
+    return schedule